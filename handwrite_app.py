@@ -6,14 +6,25 @@ from pathlib import Path
 from PySide6.QtWidgets import *
 from PySide6.QtCore import *
 from PySide6.QtGui import *
-from PIL import Image, ImageFont, ImageQt, ImageDraw
-from functools import partial
+import PIL
+from PIL import Image, ImageFont, ImageDraw
+from functools import partial, lru_cache
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 import time
+import math
 import os
 import threading
+import queue
+import weakref
 import zipfile
 import shutil
+import subprocess
 import io
+import mmap
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 try:
     from handright import Template, handwrite
@@ -21,6 +32,412 @@ except ImportError:
     print("请先安装 handright: pip install handright pillow")
     sys.exit(1)
 
+import handright._core as handright_core
+
+# charset-normalizer 为可选依赖，未安装时逐个尝试常见编码
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+# img2pdf 为可选依赖，未安装时使用 PIL 的PDF编码器
+try:
+    import img2pdf
+except ImportError:
+    img2pdf = None
+
+# orjson 为可选依赖，未安装时使用标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numpy 为可选依赖，未安装时排版扰动逐个调用 random.gauss，也不启用下面依赖它的加速
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# PyTurboJPEG 为可选依赖（需要 numpy），未安装或找不到 libjpeg-turbo 时使用 PIL 的JPEG编码器
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJPF_GRAY, TJSAMP_420, TJSAMP_GRAY
+except ImportError:
+    TurboJPEG = None
+if np is None:
+    TurboJPEG = None
+
+# numba 为可选依赖，未安装时使用 handright 自带的纯Python渲染
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    def _make_perturb_kernel(width, height, fill):
+        """生成专用的笔画扰动内核，画布尺寸和填充色作为编译期常量参与优化"""
+        channels = len(fill)
+
+        @njit(fastmath=True, cache=True, nogil=True)
+        def perturb_strokes(canvas, xs, ys, starts, offsets):
+            """对每个笔画施加平移和旋转扰动后写入画布"""
+            for s in range(starts.shape[0] - 1):
+                begin = starts[s]
+                end = starts[s + 1]
+                if begin == end:
+                    continue
+                dx = offsets[s, 0]
+                dy = offsets[s, 1]
+                theta = offsets[s, 2]
+                # 笔画包围盒的中心作为旋转中心，与坐标变换在同一个循环内完成
+                min_x = max_x = xs[begin]
+                min_y = max_y = ys[begin]
+                for i in range(begin + 1, end):
+                    min_x = min(min_x, xs[i])
+                    max_x = max(max_x, xs[i])
+                    min_y = min(min_y, ys[i])
+                    max_y = max(max_y, ys[i])
+                cx = (min_x + max_x) / 2
+                cy = (min_y + max_y) / 2
+                cos_t = np.cos(theta)
+                sin_t = np.sin(theta)
+                for i in range(begin, end):
+                    x = xs[i]
+                    y = ys[i]
+                    if theta != 0:
+                        new_x = (x - cx) * cos_t + (y - cy) * sin_t + cx
+                        new_y = (y - cy) * cos_t - (x - cx) * sin_t + cy
+                    else:
+                        new_x = x
+                        new_y = y
+                    px = int(np.rint(new_x + dx))
+                    py = int(np.rint(new_y + dy))
+                    if 0 <= px < width and 0 <= py < height:
+                        for c in range(channels):
+                            canvas[py, px, c] = fill[c]
+
+        return perturb_strokes
+
+class HandrightAccelerator:
+    """handright 渲染加速器，用 numba 编译笔画扰动的内循环"""
+
+    # 可以直接按字节操作的背景模式
+    SUPPORTED_MODES = ("L", "RGB", "RGBA")
+
+    _original_perturb_and_merge = handright_core._Renderer._perturb_and_merge
+    _kernels = {}  # (宽, 高, 填充色) -> 专用内核
+
+    # 默认白色背景的尺寸和填充色，用于启动时预编译
+    DEFAULT_CANVAS = (1000, 1000, (0, 0, 0))
+
+    @staticmethod
+    def is_available():
+        """是否可以使用加速渲染"""
+        return njit is not None
+
+    @staticmethod
+    def install():
+        """替换 handright 渲染器中逐像素扰动的实现"""
+        if HandrightAccelerator.is_available():
+            handright_core._Renderer._perturb_and_merge = HandrightAccelerator.perturb_and_merge
+
+    @staticmethod
+    def get_kernel(width, height, fill):
+        """获取指定画布尺寸和填充色的内核，参数不变时复用已编译的版本"""
+        key = (width, height, fill)
+        kernel = HandrightAccelerator._kernels.get(key)
+        if kernel is None:
+            kernel = HandrightAccelerator._kernels.setdefault(key, _make_perturb_kernel(width, height, fill))
+        return kernel
+
+    @staticmethod
+    def perturb_and_merge(renderer, page):
+        """与 handright 的 _Renderer._perturb_and_merge 等价的加速版本"""
+        template = handright_core._get_template(renderer._templates, page.num)
+        background = template.get_background()
+        if background.mode not in HandrightAccelerator.SUPPORTED_MODES:
+            return HandrightAccelerator._original_perturb_and_merge(renderer, page)
+
+        bbox = page.image.getbbox()
+        if bbox is None:
+            return background.copy()
+        strokes = handright_core._extract_strokes(page.matrix(), bbox)
+
+        # 笔画以 (x << 16) | y 的形式存储，笔画之间用 _STROKE_END 分隔
+        packed = np.frombuffer(strokes._array, dtype=f"u{strokes._array.itemsize}").astype(np.int64)
+        is_point = packed != handright_core._STROKE_END
+        stroke_ends = np.flatnonzero(~is_point)
+        lengths = np.diff(stroke_ends, prepend=-1) - 1
+        starts = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=starts[1:])
+
+        points = packed[is_point]
+        xs = points >> 16
+        ys = points & 0xFFFF
+
+        # 一次性批量抽取所有笔画的 (dx, dy, theta)，种子取自渲染器的随机状态，
+        # 因此指定 seed 时结果仍可复现
+        rng = np.random.default_rng(renderer._rand.getrandbits(64))
+        sigmas = np.array([
+            template.get_perturb_x_sigma(),
+            template.get_perturb_y_sigma(),
+            template.get_perturb_theta_sigma()
+        ], dtype=np.float64)
+        offsets = rng.standard_normal((len(lengths), 3)) * sigmas
+
+        canvas = np.array(background)
+        canvas = canvas.reshape(canvas.shape[0], canvas.shape[1], -1)
+        fill = tuple(int(v) for v in np.atleast_1d(template.get_fill()))
+        kernel = HandrightAccelerator.get_kernel(background.width, background.height, fill)
+        kernel(canvas, xs, ys, starts, offsets)
+
+        if background.mode == "L":
+            canvas = canvas[:, :, 0]
+        return Image.fromarray(canvas, background.mode)
+
+    @staticmethod
+    def warm_up():
+        """预先编译 numba 内核，避免首次渲染时的编译延迟"""
+        if not HandrightAccelerator.is_available():
+            return
+        width, height, fill = HandrightAccelerator.DEFAULT_CANVAS
+        canvas = np.zeros((2, 2, len(fill)), dtype=np.uint8)
+        points = np.zeros(1, dtype=np.int64)
+        HandrightAccelerator.get_kernel(width, height, fill)(
+            canvas, points, points,
+            np.array([0, 1], dtype=np.int64),
+            np.zeros((1, 3), dtype=np.float64)
+        )
+
+HandrightAccelerator.install()
+
+class GlyphAtlas:
+    """字形缓存，中文文本字形复用率很高，缓存栅格化结果可以省去重复的FreeType渲染"""
+
+    MAX_GLYPHS = 4096  # 缓存的字形上限，超出后淘汰最久未使用的字形
+    MAX_FONTS = 32  # 缓存的随机字号字体上限，超出后淘汰最久未使用的字体
+
+    _fonts = OrderedDict()   # (字体, 字号) -> FreeTypeFont，按使用顺序排列
+    _glyphs = OrderedDict()  # (字体, 字号, 字符) -> (字形掩码, 偏移, 字宽)，按使用顺序排列
+    _lock = threading.Lock()  # 预览和导出线程可能同时排版
+
+    @staticmethod
+    def install():
+        """替换 handright 排版阶段的取字体和绘制字符函数"""
+        handright_core._get_font = GlyphAtlas.get_font
+        handright_core._draw_char = GlyphAtlas.draw_char
+
+    @staticmethod
+    def font_key(font):
+        """字体标识，从内存加载的字体没有文件路径，使用对象标识代替"""
+        path = font.path if isinstance(font.path, (str, bytes)) else id(font.path)
+        return path, font.index
+
+    @staticmethod
+    def get_font(tpl, rand):
+        """与 handright 的 _get_font 等价，但复用相同字号的字体对象"""
+        font = tpl.get_font()
+        actual_font_size = max(round(
+            handright_core.gauss(rand, font.size, tpl.get_font_size_sigma())
+        ), 0)
+        if actual_font_size == font.size:
+            return font
+        key = (GlyphAtlas.font_key(font), actual_font_size)
+        fonts = GlyphAtlas._fonts
+        with GlyphAtlas._lock:
+            variant = fonts.get(key)
+            if variant is not None:
+                fonts.move_to_end(key)
+                return variant
+        variant = font.font_variant(size=actual_font_size)
+        with GlyphAtlas._lock:
+            variant = fonts.setdefault(key, variant)
+            if len(fonts) > GlyphAtlas.MAX_FONTS:
+                fonts.popitem(last=False)
+        return variant
+
+    @staticmethod
+    def get(char, font):
+        """获取字符的字形掩码、绘制偏移和字宽，未命中时栅格化并缓存"""
+        key = (GlyphAtlas.font_key(font), font.size, char)
+        glyphs = GlyphAtlas._glyphs
+        with GlyphAtlas._lock:
+            glyph = glyphs.get(key)
+            if glyph is not None:
+                glyphs.move_to_end(key)
+                return glyph
+            # 字体对象在预览和导出线程间共享，FreeType 字体不能被多个线程同时使用，栅格化也在锁内进行
+            mask, offset = font.getmask2(char, mode="1")
+            left, top, right, bottom = font.getbbox(char)
+            glyph = (mask, offset, right - left)
+            glyphs[key] = glyph
+            if len(glyphs) > GlyphAtlas.MAX_GLYPHS:
+                glyphs.popitem(last=False)
+        return glyph
+
+    @staticmethod
+    def draw_char(draw, char, xy, font):
+        """与 handright 的 _draw_char 等价，直接贴上缓存的字形掩码"""
+        mask, offset, advance = GlyphAtlas.get(char, font)
+        ink = draw.draw.draw_ink(handright_core._WHITE)
+        draw.draw.draw_bitmap((xy[0] + offset[0], xy[1] + offset[1]), mask, ink)
+        return advance
+
+    @staticmethod
+    def clear():
+        """清空缓存"""
+        GlyphAtlas._fonts.clear()
+        GlyphAtlas._glyphs.clear()
+
+GlyphAtlas.install()
+
+class GaussSampler:
+    """批量抽取 handright 排版用的高斯扰动（字间距、行间距、字号），
+    用 numpy 一次生成一批标准正态样本，代替逐字调用 random.gauss"""
+
+    BATCH_SIZE = 4096  # 每批预先生成的样本数
+
+    _original_render_page = handright_core._Renderer.__call__
+    _samples = weakref.WeakKeyDictionary()  # 随机数生成器 -> 尚未使用的标准正态样本
+    _lock = threading.Lock()  # 预览和导出线程可能同时排版
+
+    @staticmethod
+    def install():
+        """替换 handright 的 gauss 函数，并在渲染器逐页重新设置种子时丢弃旧的样本"""
+        if np is not None:
+            handright_core.gauss = GaussSampler.gauss
+            handright_core._Renderer.__call__ = GaussSampler.render_page
+
+    @staticmethod
+    def render_page(renderer, page):
+        """渲染器每页都会重新设置随机种子，先丢弃上一页剩余的样本，各页的结果与渲染顺序无关"""
+        GaussSampler.reset(renderer._rand)
+        return GaussSampler._original_render_page(renderer, page)
+
+    @staticmethod
+    def reset(rand):
+        """丢弃 rand 尚未使用的样本，下次抽样时按 rand 的当前状态重新生成"""
+        with GaussSampler._lock:
+            GaussSampler._samples.pop(rand, None)
+
+    @staticmethod
+    def gauss(rand, mu, sigma):
+        """与 handright 的 gauss 等价，样本种子取自 rand，因此指定 seed 时结果仍可复现"""
+        if sigma == 0:
+            return mu
+        with GaussSampler._lock:
+            samples = GaussSampler._samples.get(rand)
+            if not samples:
+                rng = np.random.default_rng(rand.getrandbits(64))
+                # 倒序存放，从末尾弹出样本
+                samples = rng.standard_normal(GaussSampler.BATCH_SIZE).tolist()[::-1]
+                GaussSampler._samples[rand] = samples
+            sample = samples.pop()
+        return mu + sigma * sample
+
+GaussSampler.install()
+
+class DirectoryCache:
+    """目录列表缓存，目录的修改时间不变时直接返回上次的扫描结果"""
+
+    _listings = {}  # (目录, 扩展名) -> (修改时间, 文件列表)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def scan(path, exts):
+        """列出目录中指定扩展名的文件，按扩展名的顺序分组排列，目录不存在时返回空列表"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return []
+        key = (str(path), tuple(exts))
+        cached = DirectoryCache._listings.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        # scandir 的目录项自带文件类型，is_file() 通常不需要额外的 stat 调用
+        try:
+            with os.scandir(path) as it:
+                entries = sorted((e for e in it if e.is_file()), key=lambda e: e.name)
+        except OSError:  # 路径不是目录或无法读取
+            return []
+        # 扩展名不区分大小写，与 Windows 上的 glob 一致
+        suffixes = [os.path.splitext(e.name)[1].lower() for e in entries]
+        listing = [Path(e.path) for ext in exts for e, suffix in zip(entries, suffixes) if suffix == ext.lower()]
+        with DirectoryCache._lock:
+            DirectoryCache._listings[key] = (mtime, listing)
+        return listing
+
+class FontCache:
+    """字体缓存，按 (路径, 字号) 共享 FreeTypeFont 实例，避免每次渲染重新解析TTF文件"""
+
+    MAX_FONTS = 32  # 最多缓存的字体实例数，拖动字号时按最近使用淘汰
+
+    _font_paths = {}  # 字体名称 -> 解析出的字体文件路径
+
+    @staticmethod
+    @lru_cache(maxsize=MAX_FONTS)
+    def get(path, size):
+        """获取指定路径和字号的字体"""
+        return ImageFont.truetype(path, size=size)
+
+    @staticmethod
+    def list_fonts():
+        """获取字体目录中的字体文件，目录没有变化时不重新扫描"""
+        return DirectoryCache.scan("fonts", (".ttf",))
+
+    @staticmethod
+    def resolve_path(font_name):
+        """根据字体名称查找字体文件，结果按名称缓存，避免每次创建模板都扫描目录"""
+        font_path = FontCache._font_paths.get(font_name)
+        if font_path is None:
+            font_path = Path("fonts") / f"{font_name}.ttf"
+            if not font_path.exists():
+                # 尝试查找完整文件名
+                for font_file in FontCache.list_fonts():
+                    if font_file.stem == font_name:
+                        font_path = font_file
+                        break
+                else:
+                    # 使用系统默认字体，不缓存，之后放入字体目录的同名字体仍能找到
+                    return "simsun.ttc"
+            FontCache._font_paths[font_name] = font_path
+        return font_path
+
+class BackgroundCache:
+    """背景图缓存，handright 只读取背景而不修改它，同一张背景可以在各次渲染间共享"""
+
+    DEFAULT = Image.new('RGB', (1000, 1000), color='white')  # 默认白色背景
+
+    @staticmethod
+    def get(path):
+        """获取背景图，文件修改后按新的修改时间重新加载"""
+        if path:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                return BackgroundCache.DEFAULT
+            return BackgroundCache._load(path, mtime)
+        return BackgroundCache.DEFAULT
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _load(path, mtime):
+        return Image.open(path).convert('RGB')
+
+class FontPreloadTask(QRunnable):
+    """在线程池中预先加载字体，把TTF解析的耗时隐藏在窗口构建期间"""
+
+    def __init__(self, font_files, size):
+        super().__init__()
+        self.font_files = list(font_files)
+        self.size = size
+
+    def run(self):
+        for font_file in self.font_files:
+            try:
+                FontCache.get(str(font_file), self.size)
+            except Exception as e:
+                print(f"预加载字体失败 {font_file.name}: {e}")
+
 # 内置样式和默认设置
 class StyleManager:
     """样式和默认设置管理器，直接将资源内嵌到代码中"""
@@ -70,7 +487,7 @@ class StyleManager:
             padding: 0 3px 0 3px;
         }
 
-        QTextEdit {
+        QTextEdit, QPlainTextEdit {
             border: 1px solid #cccccc;
             border-radius: 4px;
             background-color: #ffffff;
@@ -121,29 +538,111 @@ class StyleManager:
         """应用默认样式到应用程序"""
         app.setStyleSheet(StyleManager.get_default_style())
 
-# 添加工作线程类，用于处理耗时的渲染操作
-class WorkerThread(QThread):
-    """工作线程类，用于后台处理耗时的渲染任务"""
-    progressChanged = Signal(int)  # 进度更新信号
+# 渲染任务，用于在线程池中处理耗时的渲染操作
+class RenderSignals(QObject):
+    """渲染任务的信号载体
+    
+    渲染线程把进度写入队列，由界面线程定时读取并只发出最新的值，
+    避免每次进度变化都跨线程投递一个信号
+    
+    创建时需指定界面线程中的 parent，由 parent 持有，任务结束后在界面线程中 deleteLater，
+    渲染线程释放任务时不会在工作线程里销毁对象和其中的定时器
+    """
+    PROGRESS_INTERVAL = 50  # 读取进度的间隔(毫秒)
+    
+    progressChanged = Signal(int)  # 进度更新信号，在界面线程中发出
     resultReady = Signal(object)   # 结果就绪信号
     errorOccurred = Signal(str)    # 错误信号
+    finished = Signal()            # 任务结束（包括被取消）
     
-    def __init__(self, text, template, parent=None):
+    def __init__(self, parent=None):
         super().__init__(parent)
+        self.progress_queue = queue.SimpleQueue()
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(self.PROGRESS_INTERVAL)
+        self.progress_timer.timeout.connect(self.poll_progress)
+        # 先于外部连接，保证结果处理之前已发出最后的进度
+        self.resultReady.connect(self.poll_progress)
+        self.errorOccurred.connect(self.poll_progress)
+        self.finished.connect(self.progress_timer.stop)
+        self.finished.connect(self.deleteLater)
+        self.progress_timer.start()
+    
+    def report_progress(self, value):
+        """记录进度，可在任意线程中调用"""
+        self.progress_queue.put(value)
+    
+    def poll_progress(self):
+        """取出队列中的全部进度，只发出最新的一个"""
+        latest = None
+        while True:
+            try:
+                latest = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None:
+            self.progressChanged.emit(latest)
+
+class RenderJob(QRunnable):
+    """渲染任务，在全局线程池中执行，线程由线程池复用，不再每次新建"""
+    
+    IN_FLIGHT_PER_WORKER = 2  # 每个工作进程最多排队的页数，每次提交都要序列化整张背景图
+    
+    def __init__(self, text, template, signals, executor=None):
+        super().__init__()
         self.text = text
         self.template = template
+        self.signals = signals
+        self.executor = executor  # 进程池，传入时使用多进程并行渲染页面
         self.is_cancelled = False
         
+    def map_pages(self, fn, pages):
+        """把每页的渲染任务提交到进程池，按页序返回结果，中途退出时取消未开始的任务
+        
+        边排版边提交，同时在途的页数有上限，内存占用不随页数增长，
+        最早的页面完成后立即返回，进度从第一页开始更新
+        """
+        window = self.IN_FLIGHT_PER_WORKER * (os.cpu_count() or 1)
+        futures = deque()
+        try:
+            for page in pages:
+                futures.append(self.executor.submit(fn, page))
+                # 在途页数达到上限时等待最早的一页，否则只返回已经完成的页面
+                while futures and (len(futures) >= window or futures[0].done()):
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+        
+    def estimate_pages(self):
+        """按每页可容纳的字数估算页数，用于预先分配结果列表"""
+        tpl = self.template
+        width, height = tpl.get_background().size
+        font_size = tpl.get_font().size
+        chars_per_line = (width - tpl.get_left_margin() - tpl.get_right_margin()) // max(1, font_size + tpl.get_word_spacing())
+        lines_per_page = (height - tpl.get_top_margin() - tpl.get_bottom_margin()) // max(1, tpl.get_line_spacing())
+        return math.ceil(len(self.text) / max(1, chars_per_line * lines_per_page))
+        
     def run(self):
         """执行渲染任务"""
         try:
-            result = []
             # 检查必要的参数
             if not self.text:
                 self.text = "预览文本示例"
             
-            # 使用生成器获取页面，并更新进度
-            pages = handwrite(self.text, self.template)
+            # 预先分配结果列表，长文本导出时不会反复扩容
+            result = [None] * self.estimate_pages()
+            count = 0
+            
+            # 多页渲染时，将每页的笔画扰动交给进程池并行处理（绕开GIL），
+            # handright 的 mapper 会按页序返回结果
+            if self.executor is not None:
+                pages = handwrite(self.text, self.template, mapper=self.map_pages)
+            else:
+                # 使用生成器获取页面，并更新进度
+                pages = handwrite(self.text, self.template)
             
             # 设置进度监控器
             text_length = len(self.text)
@@ -154,55 +653,60 @@ class WorkerThread(QThread):
                 if self.is_cancelled:
                     break
                     
-                result.append(page)
+                if i < len(result):
+                    result[i] = page
+                else:
+                    result.append(page)
+                count = i + 1
                 
                 # 更新进度 - 根据处理的字符数而不是页数
                 chars_processed += progress_step
                 progress = min(95, int(chars_processed / text_length * 100))
-                self.progressChanged.emit(progress)
+                self.signals.report_progress(progress)
                 
             if not self.is_cancelled:
-                self.progressChanged.emit(100)
-                self.resultReady.emit(result)
+                del result[count:]  # 去掉估算多出的空位
+                self.signals.report_progress(100)
+                self.signals.resultReady.emit(result)
                 
         except Exception as e:
             error_msg = str(e)
             # 提供更具体的错误提示
             if "font.size" in error_msg and "line_spacing" in error_msg:
                 error_msg = "字体大小与行间距设置不合理。请确保行间距大于字体大小。"
-            self.errorOccurred.emit(error_msg)
+            self.signals.errorOccurred.emit(error_msg)
+        finally:
+            self.signals.finished.emit()
     
     def cancel(self):
         """取消操作"""
         self.is_cancelled = True
 
 class PreviewManager:
+    # 预览页面的最大边长，更大的页面先缩小再缓存，原始尺寸另行记录
+    DISPLAY_MAX_SIZE = 1600
+    
     def __init__(self):
-        self.last_update = 0
-        self.throttle_delay = 200  # 节流延迟(毫秒)
         self.current_page = 0
         self.pages = []
+        self.page_sizes = []  # 页面的原始尺寸
         self.cached_images = {}  # 缓存已生成的图像
-        self.last_settings = None  # 上次使用的设置
-        self.last_text = ""  # 上次渲染的文本
-        
-    def should_update(self, text, settings):
-        """判断是否需要更新预览"""
-        # 检查文本和设置是否变化
-        settings_changed = self.last_settings != settings
-        text_changed = self.last_text != text
-        
-        current_time = time.time() * 1000
-        if (current_time - self.last_update > self.throttle_delay) and (settings_changed or text_changed):
-            self.last_update = current_time
-            self.last_settings = settings.copy() if settings else None
-            self.last_text = text
-            return True
-        return False
+        
+    @staticmethod
+    def downsample(image):
+        """将页面缩小到预览分辨率"""
+        factor = math.ceil(max(image.size) / PreviewManager.DISPLAY_MAX_SIZE)
+        return image.reduce(factor) if factor > 1 else image
     
-    def set_pages(self, pages):
-        self.pages = list(pages)
+    def set_pages(self, pages, scale=1):
+        """设置预览页面，scale 为页面相对原始尺寸的缩小倍数"""
+        self.pages = []
+        self.page_sizes = []
+        for page in pages:
+            self.page_sizes.append((page.width * scale, page.height * scale))
+            self.pages.append(self.downsample(page))
         self.current_page = 0
+        self.clear_cache()  # 页面变化后旧的转换结果失效
     
     def get_current_page(self):
         if self.pages:
@@ -228,6 +732,12 @@ class PreviewManager:
             return True
         return False
     
+    def get_current_page_size(self):
+        """获取当前页面的原始尺寸"""
+        if self.page_sizes:
+            return self.page_sizes[self.current_page]
+        return None
+    
     def get_page_info(self):
         return f"第 {self.current_page + 1} 页,共 {len(self.pages)} 页"
     
@@ -238,13 +748,81 @@ class PreviewManager:
         """清除缓存"""
         self.cached_images.clear()
 
+class PixmapBuildSignals(QObject):
+    """图像转换任务的信号载体"""
+    finished = Signal(int, int, object)  # 任务编号, 页码, (QImage, 像素数据)
+
+class PixmapBuildTask(QRunnable):
+    """在线程池中把PIL图像转换为QImage，避免整页像素拷贝阻塞界面线程"""
+
+    def __init__(self, job_id, page_index, image, signals):
+        super().__init__()
+        self.job_id = job_id
+        self.page_index = page_index
+        self.image = image
+        self.signals = signals
+
+    def run(self):
+        result = PreviewWidget.image_to_qimage(self.image)
+        self.signals.finished.emit(self.job_id, self.page_index, result)
+
+class ImportSignals(QObject):
+    """文件导入任务的信号载体"""
+    chunkReady = Signal(str)     # 一段已提取的文本
+    finished = Signal()          # 导入完成
+    errorOccurred = Signal(str)  # 错误信号
+
+class ImportTask(QRunnable):
+    """在线程池中提取文件文本，分段发回界面线程，大文件导入时界面不会卡住"""
+    
+    CHUNK_SIZE = 64 * 1024  # 攒够这么多字符再发送一次，减少跨线程信号次数
+
+    def __init__(self, file_path, signals):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = signals
+        self.is_cancelled = False
+
+    def run(self):
+        try:
+            pieces = []
+            size = 0
+            for piece in FileManager.iter_text(self.file_path):
+                if self.is_cancelled:
+                    return
+                pieces.append(piece)
+                size += len(piece)
+                if size >= self.CHUNK_SIZE:
+                    self.signals.chunkReady.emit(''.join(pieces))
+                    pieces.clear()
+                    size = 0
+            if pieces:
+                self.signals.chunkReady.emit(''.join(pieces))
+            self.signals.finished.emit()
+        except Exception as e:
+            self.signals.errorOccurred.emit(f"导入文件失败: {str(e)}")
+
+    def cancel(self):
+        """取消导入"""
+        self.is_cancelled = True
+
 class PreviewWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.preview_manager = PreviewManager()
         self.zoom_level = 100  # 默认缩放级别为100%
+        self._base_pixmap = None  # 当前页面的原尺寸图像，缩放时直接在其上缩放
+        
+        # 后台图像转换，只有最新一次请求的结果会被显示
+        self._pixmap_job_id = 0
+        self.pixmap_signals = PixmapBuildSignals()
+        self.pixmap_signals.finished.connect(self.on_pixmap_ready)
+        
         self.setup_ui()
-        self.worker = None  # 保存当前的工作线程
+        self.worker = None  # 保存当前的渲染任务
+        self.progress_dialog = None  # 当前预览的进度对话框
+        self.rendered_key = None  # 当前显示的预览对应的渲染输入
+        self.pending_key = None  # 正在渲染的预览对应的渲染输入
     
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -299,32 +877,65 @@ class PreviewWidget(QWidget):
         
         self.update_navigation()
     
-    def update_preview(self, text, template):
-        """更新预览内容"""
-        # 检查是否有正在运行的线程，如果有则取消
-        if self.worker and self.worker.isRunning():
-            self.worker.cancel()
-            self.worker.wait(100)  # 等待线程结束
+    def is_current(self, key):
+        """预览是否已经显示或正在渲染这组输入"""
+        return key is not None and key in (self.rendered_key, self.pending_key)
+    
+    def update_preview(self, text, template, scale=1, key=None):
+        """更新预览内容，template 按 scale 缩小渲染时，显示时放大回原始尺寸
+        
+        key 标识本次渲染的输入，相同输入的后续请求可以通过 is_current 跳过
+        """
+        self.pending_key = key
+        # 取消上一次的渲染任务，但不在界面线程上等待它结束
+        if self.worker is not None:
+            self.discard_worker(self.worker)
+        
+        # 关闭上一次的进度对话框
+        if self.progress_dialog is not None:
+            self.progress_dialog.reset()
+            self.progress_dialog.deleteLater()
         
         # 创建进度对话框
         progress_dialog = QProgressDialog("正在生成预览...", "取消", 0, 100, self)
         progress_dialog.setWindowModality(Qt.WindowModal)
         progress_dialog.setMinimumDuration(500)  # 仅当操作超过500ms时显示
+        self.progress_dialog = progress_dialog
         
-        # 创建工作线程
-        self.worker = WorkerThread(text, template)
-        self.worker.progressChanged.connect(progress_dialog.setValue)
-        self.worker.resultReady.connect(lambda images: self.handle_preview_result(images))
-        self.worker.errorOccurred.connect(self.handle_preview_error)
+        # 创建渲染任务
+        signals = RenderSignals(self)
+        signals.progressChanged.connect(progress_dialog.setValue)
+        signals.resultReady.connect(lambda images: self.handle_preview_result(images, scale))
+        signals.errorOccurred.connect(self.handle_preview_error)
+        self.worker = RenderJob(text, template, signals)
         
         # 连接取消按钮
         progress_dialog.canceled.connect(self.worker.cancel)
+        progress_dialog.canceled.connect(self.cancel_pending)
         
-        # 启动线程
-        self.worker.start()
+        # 提交到线程池
+        QThreadPool.globalInstance().start(self.worker)
+    
+    def invalidate(self):
+        """忘记已显示和正在渲染的输入，下一次请求一定重新渲染"""
+        self.rendered_key = None
+        self.pending_key = None
+    
+    def cancel_pending(self):
+        """取消的渲染不会产生结果，相同输入的下一次请求需要重新渲染"""
+        self.pending_key = None
+    
+    def discard_worker(self, worker):
+        """取消任务并断开其信号，任务在下一次检查取消标志时自行结束，由线程池回收"""
+        worker.cancel()
+        worker.signals.progressChanged.disconnect()
+        worker.signals.resultReady.disconnect()
+        worker.signals.errorOccurred.disconnect()
+        self.worker = None
     
     def handle_preview_error(self, error_msg):
         """处理预览错误"""
+        self.pending_key = None
         QMessageBox.warning(self, "预览错误", error_msg)
         
         # 如果没有页面可显示，显示一个错误图像
@@ -335,41 +946,90 @@ class PreviewWidget(QWidget):
             draw.text((50, 50), f"预览错误: {error_msg}", fill=(255, 0, 0))
             
             # 添加到预览管理器
+            self.rendered_key = None
             self.preview_manager.set_pages([error_image])
             self.show_current_page()
             self.update_navigation()
     
-    def handle_preview_result(self, images):
+    def handle_preview_result(self, images, scale=1):
         """处理预览结果"""
         if not images:
             self.handle_preview_error("未能生成预览图像，可能是参数设置不合理")
             return
             
-        self.preview_manager.set_pages(images)
+        self.rendered_key, self.pending_key = self.pending_key, None
+        self.preview_manager.set_pages(images, scale)
         self.page_spin.setMaximum(max(1, len(images)))
         self.show_current_page()
         self.update_navigation()
     
+    @staticmethod
+    def image_to_qimage(image):
+        """直接用PIL图像的原始字节构造QImage
+        
+        Returns:
+            tuple: (QImage, 像素数据)，QImage 不持有像素数据，使用期间需保证其存活
+        """
+        if image.mode == "RGB":
+            image_format, channels = QImage.Format_RGB888, 3
+        else:
+            image = image.convert("RGBA")
+            image_format, channels = QImage.Format_RGBA8888, 4
+        
+        buf = image.tobytes()
+        qt_image = QImage(buf, image.width, image.height, image.width * channels, image_format)
+        return qt_image, buf
+    
+    def get_current_pixmap(self):
+        """获取当前页面已转换好的QPixmap，尚未转换时返回None"""
+        return self.preview_manager.cached_images.get(self.preview_manager.current_page)
+    
     def show_current_page(self):
         """显示当前页面"""
+        pixmap = self.get_current_pixmap()
+        if pixmap:
+            self.display_pixmap(pixmap)
+            return
+        
         current_image = self.preview_manager.get_current_page()
         if current_image:
-            # 转换为Qt图像
-            qt_image = ImageQt.ImageQt(current_image)
-            pixmap = QPixmap.fromImage(qt_image)
-            
-            # 应用缩放
-            self.apply_zoom(pixmap)
-            
-            # 更新页码
-            self.page_spin.setValue(self.preview_manager.current_page + 1)
+            # 在线程池中转换，完成后由 on_pixmap_ready 显示
+            self._pixmap_job_id += 1
+            QThreadPool.globalInstance().start(PixmapBuildTask(
+                self._pixmap_job_id,
+                self.preview_manager.current_page,
+                current_image,
+                self.pixmap_signals
+            ))
+    
+    def on_pixmap_ready(self, job_id, page_index, result):
+        """图像转换完成，丢弃过期的结果"""
+        if job_id != self._pixmap_job_id:
+            return
+        
+        qt_image, buf = result
+        pixmap = QPixmap.fromImage(qt_image)
+        self.preview_manager.cached_images[page_index] = pixmap
+        if page_index == self.preview_manager.current_page:
+            self.display_pixmap(pixmap)
+    
+    def display_pixmap(self, pixmap):
+        """显示指定的页面图像"""
+        self._base_pixmap = pixmap
+        
+        # 应用缩放
+        self.apply_zoom(pixmap)
+        
+        # 更新页码
+        self.page_spin.setValue(self.preview_manager.current_page + 1)
     
     def apply_zoom(self, pixmap):
         """应用缩放到图像"""
         if pixmap:
-            # 计算缩放后的尺寸
-            scaled_width = int(pixmap.width() * self.zoom_level / 100)
-            scaled_height = int(pixmap.height() * self.zoom_level / 100)
+            # 按页面的原始尺寸计算缩放后的尺寸，缓存的图像可能已被缩小
+            width, height = self.preview_manager.get_current_page_size() or (pixmap.width(), pixmap.height())
+            scaled_width = int(width * self.zoom_level / 100)
+            scaled_height = int(height * self.zoom_level / 100)
             
             # 缩放图像
             scaled_pixmap = pixmap.scaled(
@@ -386,25 +1046,18 @@ class PreviewWidget(QWidget):
         """设置缩放级别"""
         self.zoom_level = max(10, min(300, level))  # 限制在10%-300%之间
         self.zoom_label.setText(f"{self.zoom_level}%")
-        current_image = self.preview_manager.get_current_page()
-        if current_image:
-            qt_image = ImageQt.ImageQt(current_image)
-            pixmap = QPixmap.fromImage(qt_image)
-            self.apply_zoom(pixmap)
+        if self._base_pixmap:
+            self.apply_zoom(self._base_pixmap)
     
     def fit_to_window(self):
         """适合窗口显示"""
-        current_image = self.preview_manager.get_current_page()
-        if current_image:
-            qt_image = ImageQt.ImageQt(current_image)
-            pixmap = QPixmap.fromImage(qt_image)
-            
+        page_size = self.preview_manager.get_current_page_size()
+        if page_size:
             # 计算合适的缩放比例
             view_width = self.scroll_area.viewport().width() - 20
             view_height = self.scroll_area.viewport().height() - 20
             
-            image_width = pixmap.width()
-            image_height = pixmap.height()
+            image_width, image_height = page_size
             
             width_ratio = view_width / image_width
             height_ratio = view_height / image_height
@@ -554,10 +1207,8 @@ class SettingsPanel(QWidget):
     def update_font_list(self):
         """更新字体列表"""
         self.font_combo.clear()
-        fonts_dir = Path("fonts")
-        if fonts_dir.exists():
-            for font in fonts_dir.glob("*.ttf"):
-                self.font_combo.addItem(font.stem)
+        for font in FontCache.list_fonts():
+            self.font_combo.addItem(font.stem)
         if self.font_combo.count() == 0:
             self.font_combo.addItem("默认字体")
     
@@ -581,13 +1232,12 @@ class SettingsPanel(QWidget):
             settings = self.get_current_settings()
             # 保存到文件
             presets_file = Path("presets.json")
-            presets = {}
-            if presets_file.exists():
-                with open(presets_file, 'r', encoding='utf-8') as f:
-                    presets = json.load(f)
+            try:
+                presets = SettingsManager.read_json(presets_file)
+            except FileNotFoundError:
+                presets = {}
             presets[name] = settings
-            with open(presets_file, 'w', encoding='utf-8') as f:
-                json.dump(presets, f, ensure_ascii=False, indent=2)
+            SettingsManager.write_json(presets_file, presets)
             
             if self.preset_combo.findText(name) == -1:
                 self.preset_combo.addItem(name)
@@ -604,50 +1254,164 @@ class SettingsPanel(QWidget):
         
         if reply == QMessageBox.Yes:
             presets_file = Path("presets.json")
-            if presets_file.exists():
-                with open(presets_file, 'r', encoding='utf-8') as f:
-                    presets = json.load(f)
-                if current in presets:
-                    del presets[current]
-                    with open(presets_file, 'w', encoding='utf-8') as f:
-                        json.dump(presets, f, ensure_ascii=False, indent=2)
+            try:
+                presets = SettingsManager.read_json(presets_file)
+            except FileNotFoundError:
+                presets = {}
+            if current in presets:
+                del presets[current]
+                SettingsManager.write_json(presets_file, presets)
             
             self.preset_combo.removeItem(self.preset_combo.currentIndex())
 
+@dataclass(slots=True, frozen=True)
+class Settings:
+    """渲染设置，不可变且可哈希，可以直接作为预览缓存的键"""
+    font: str
+    font_size: int
+    top_margin: int
+    bottom_margin: int
+    left_margin: int
+    right_margin: int
+    word_spacing: int
+    line_spacing: int
+    word_spacing_sigma: float
+    line_spacing_sigma: float
+    font_size_sigma: float
+    perturb_x_sigma: float
+    perturb_y_sigma: float
+    perturb_theta_sigma: float
+
+    def to_template(self, background, scale=1):
+        """创建 handright 模板，scale 大于1时按比例缩小画布、字号、间距和扰动，用于快速预览"""
+        font_path = FontCache.resolve_path(self.font)
+        font_size = self.font_size
+        line_spacing = self.line_spacing
+        if scale > 1:
+            background = background.reduce(scale)
+            font_size = max(1, font_size // scale)
+            # 取整后仍需保证行间距大于字体大小
+            line_spacing = max(line_spacing // scale, font_size + 1)
+        
+        return Template(
+            background=background,
+            font=FontCache.get(str(font_path), font_size),
+            line_spacing=line_spacing,
+            word_spacing=self.word_spacing // scale,
+            left_margin=self.left_margin // scale,
+            top_margin=self.top_margin // scale,
+            right_margin=self.right_margin // scale,
+            bottom_margin=self.bottom_margin // scale,
+            word_spacing_sigma=self.word_spacing_sigma / scale,
+            line_spacing_sigma=self.line_spacing_sigma / scale,
+            font_size_sigma=self.font_size_sigma / scale,
+            perturb_x_sigma=self.perturb_x_sigma / scale,
+            perturb_y_sigma=self.perturb_y_sigma / scale,
+            perturb_theta_sigma=self.perturb_theta_sigma  # 旋转角度与分辨率无关
+        )
+
+    def to_dict(self):
+        """转换为设置文件和预设使用的字典格式"""
+        return {
+            "font": self.font,
+            "font_size": self.font_size,
+            "margins": {
+                "上边距": self.top_margin,
+                "下边距": self.bottom_margin,
+                "左边距": self.left_margin,
+                "右边距": self.right_margin,
+                "字间距": self.word_spacing,
+                "行间距": self.line_spacing
+            },
+            "distortions": {
+                "字间距扰动": self.word_spacing_sigma,
+                "行间距扰动": self.line_spacing_sigma,
+                "字体大小扰动": self.font_size_sigma,
+                "横向偏移扰动": self.perturb_x_sigma,
+                "纵向偏移扰动": self.perturb_y_sigma,
+                "旋转角度扰动": self.perturb_theta_sigma
+            }
+        }
+
 class SettingsManager:
     def __init__(self):
         self.settings_file = Path("settings.json")
         self.presets_file = Path("presets.json")
         
+        # 合并短时间内的多次设置保存，停止操作500ms后才真正写入文件
+        self._pending_settings = None
+        self.save_timer = QTimer()
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(500)
+        self.save_timer.timeout.connect(self.flush)
+    
+    @staticmethod
+    def read_json(path):
+        """读取JSON文件，优先使用 orjson 解析"""
+        if orjson is not None:
+            return orjson.loads(path.read_bytes())
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @staticmethod
+    def write_json(path, data):
+        """写入JSON文件，优先使用 orjson 直接输出UTF-8字节
+        
+        先写入同目录下的 .tmp 文件并刷到磁盘，再原子替换，避免写到一半时断电留下损坏的文件
+        """
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        try:
+            if orjson is not None:
+                with open(tmp, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp, path)
+        finally:
+            # 写入或替换失败时不留下临时文件，替换成功后临时文件已不存在
+            tmp.unlink(missing_ok=True)
+        
     def load_settings(self):
         """加载设置，如果找不到设置文件则使用默认设置"""
-        if self.settings_file.exists():
-            try:
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载设置失败: {e}")
-                return StyleManager.get_default_settings()
-        else:
+        # 直接打开文件，不存在时再回退，省去单独的 exists() 检查
+        try:
+            return self.read_json(self.settings_file)
+        except FileNotFoundError:
             # 使用内置的默认设置
             return StyleManager.get_default_settings()
+        except Exception as e:
+            print(f"加载设置失败: {e}")
+            return StyleManager.get_default_settings()
         
     def save_settings(self, settings):
-        """保存当前设置"""
+        """保存当前设置，实际写入由防抖定时器延后执行"""
+        self._pending_settings = settings
+        self.save_timer.start()
+    
+    def flush(self):
+        """立即写入尚未保存的设置"""
+        self.save_timer.stop()
+        if self._pending_settings is None:
+            return
+        settings, self._pending_settings = self._pending_settings, None
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
+            self.write_json(self.settings_file, settings)
         except Exception as e:
             print(f"保存设置失败: {e}")
     
     def load_presets(self):
         """加载预设"""
-        if self.presets_file.exists():
-            try:
-                with open(self.presets_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载预设失败: {e}")
+        try:
+            return self.read_json(self.presets_file)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"加载预设失败: {e}")
         return {}
     
     def save_preset(self, name, settings):
@@ -655,8 +1419,7 @@ class SettingsManager:
         presets = self.load_presets()
         presets[name] = settings
         try:
-            with open(self.presets_file, 'w', encoding='utf-8') as f:
-                json.dump(presets, f, ensure_ascii=False, indent=2)
+            self.write_json(self.presets_file, presets)
             return True
         except Exception as e:
             print(f"保存预设失败: {e}")
@@ -821,7 +1584,13 @@ class ThemeManager:
         }
         """
 
+class ExportCancelled(Exception):
+    """批量导出被取消，已写出的本段文件已删除"""
+
 class FileManager:
+    _pdf_lock = threading.Lock()
+    _cancel_event = None  # 导出进程池子进程中的取消事件，由 init_render_worker 设置
+    
     @staticmethod
     def import_file(file_path):
         """导入各种格式的文件
@@ -835,57 +1604,170 @@ class FileManager:
         Raises:
             Exception: 导入失败时抛出异常
         """
+        try:
+            return ''.join(FileManager.iter_text(file_path))
+        except Exception as e:
+            raise Exception(f"导入文件失败: {str(e)}")
+    
+    @staticmethod
+    def iter_text(file_path):
+        """逐段提取文件文本，PDF按页、DOCX按段落产出，拼接后即为完整内容
+        
+        Args:
+            file_path: 文件路径对象
+            
+        Yields:
+            str: 文本片段
+        """
         ext = file_path.suffix.lower()
-        text = ""
         
-        try:
-            if ext == '.txt':
-                # 尝试多种编码
-                encodings = ['utf-8', 'gbk', 'gb2312', 'utf-16', 'ascii']
+        if ext == '.txt':
+            # 只读取一次文件，在内存中检测编码，避免每种编码重新打开文件
+            raw = file_path.read_bytes()
+            encodings = ['utf-8', 'gbk', 'gb2312', 'utf-16', 'ascii']
+            if charset_normalizer is not None:
+                # 一次检测出最可能的编码，候选范围限定为常见中文编码
+                best = charset_normalizer.from_bytes(raw, cp_isolation=encodings).best()
+                if best is None:
+                    raise ValueError(f"无法解码文件 {file_path}，请检查文件编码")
+                text = str(best)
+            else:
                 for encoding in encodings:
                     try:
-                        with open(file_path, 'r', encoding=encoding) as f:
-                            text = f.read()
-                        break  # 如果成功读取，跳出循环
+                        text = raw.decode(encoding)
+                        break  # 如果成功解码，跳出循环
                     except UnicodeDecodeError:
                         continue  # 尝试下一种编码
-                
-                if not text:  # 如果所有编码都失败
+                else:  # 如果所有编码都失败
                     raise ValueError(f"无法解码文件 {file_path}，请检查文件编码")
-                    
-            elif ext == '.docx':
-                doc = docx.Document(file_path)
-                paragraphs = []
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():  # 只添加非空段落
-                        paragraphs.append(paragraph.text)
-                text = '\n'.join(paragraphs)
+            
+            # 与文本模式读取一致，统一换行符
+            yield text.replace('\r\n', '\n').replace('\r', '\n')
                 
-            elif ext == '.pdf':
-                doc = fitz.open(file_path)
-                pages_text = []
-                for page in doc:
-                    page_text = page.get_text()
+        elif ext == '.docx':
+            doc = docx.Document(file_path)
+            first = True
+            for paragraph in doc.paragraphs:
+                if paragraph.text.strip():  # 只添加非空段落
+                    yield paragraph.text if first else '\n' + paragraph.text
+                    first = False
+            
+        elif ext == '.pdf':
+            # 一次性读入内存后由 PyMuPDF 解析，避免逐页阻塞读取
+            # PyMuPDF 不是线程安全的，多个文件并行导入时逐个调用加锁，锁不跨 yield 持有
+            data = file_path.read_bytes()
+            with FileManager._pdf_lock:
+                doc = fitz.open(stream=data, filetype="pdf")
+            try:
+                first = True
+                for page_number in range(doc.page_count):
+                    with FileManager._pdf_lock:
+                        page_text = doc[page_number].get_text('text')
                     if page_text.strip():  # 只添加非空页面
-                        pages_text.append(page_text)
-                text = '\n'.join(pages_text)
-                
-            elif ext in ['.doc', '.xls', '.ppt']:
-                raise ValueError(f"不支持旧版Office格式 ({ext})，请转换为新格式后再试")
-                
-            else:
-                raise ValueError(f"不支持的文件格式: {ext}")
-                
-            return text
-        except Exception as e:
-            raise Exception(f"导入文件失败: {str(e)}")
+                        yield page_text if first else '\n' + page_text
+                        first = False
+            finally:
+                with FileManager._pdf_lock:
+                    doc.close()
+            
+        elif ext in ['.doc', '.xls', '.ppt']:
+            raise ValueError(f"不支持旧版Office格式 ({ext})，请转换为新格式后再试")
+            
+        else:
+            raise ValueError(f"不支持的文件格式: {ext}")
+    
+    # 大于此大小的导出文件绕过页缓存直接写入磁盘，导出的文件写完后不会再读取
+    DIRECT_IO_THRESHOLD = 256 * 1024
+    DIRECT_IO_ALIGNMENT = 4096
+    
+    @staticmethod
+    def write_file(path, data):
+        """写入导出文件，较大的文件在支持的系统上使用 O_DIRECT，不支持时使用普通写入"""
+        if hasattr(os, 'O_DIRECT') and len(data) >= FileManager.DIRECT_IO_THRESHOLD:
+            try:
+                FileManager._write_direct(path, data)
+                return
+            except OSError:
+                pass  # 文件系统不支持 O_DIRECT
+        with open(path, 'wb') as f:
+            f.write(data)
+    
+    @staticmethod
+    def _write_direct(path, data):
+        """用 O_DIRECT 写入，数据复制到按页对齐的缓冲区并补齐到对齐大小，写完后截断到实际长度"""
+        size = len(data)
+        alignment = FileManager.DIRECT_IO_ALIGNMENT
+        padded = (size + alignment - 1) // alignment * alignment
+        with mmap.mmap(-1, padded) as buf:  # 匿名映射按页对齐
+            buf[:size] = data
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT, 0o644)
+            try:
+                written = 0
+                view = memoryview(buf)
+                try:
+                    while written < padded:
+                        written += os.write(fd, view[written:])
+                finally:
+                    view.release()
+                os.ftruncate(fd, size)
+            finally:
+                os.close(fd)
+    
+    @staticmethod
+    def open_folder(path):
+        """用系统文件管理器打开目录，不等待文件管理器启动完成"""
+        path = str(path)
+        if sys.platform == "win32":
+            command = ["explorer", path]
+        elif sys.platform == "darwin":
+            command = ["open", path]
+        else:
+            command = ["xdg-open", path]
+        try:
+            subprocess.Popen(command, close_fds=True)
+        except OSError as e:
+            print(f"打开目录失败: {e}")
+    
+    JPEG_QUALITY = 75  # 与 PIL 保存JPEG时的默认质量一致
+    _turbojpeg = None  # TurboJPEG 实例，首次编码JPEG时创建，不可用时为 False
+    
+    @staticmethod
+    def get_turbojpeg():
+        """获取 TurboJPEG 编码器，不可用时返回 None"""
+        if FileManager._turbojpeg is None:
+            try:
+                FileManager._turbojpeg = TurboJPEG() if TurboJPEG is not None else False
+            except OSError:
+                FileManager._turbojpeg = False  # 找不到 libjpeg-turbo 动态库
+        return FileManager._turbojpeg or None
+    
+    @staticmethod
+    def encode_image(image, img_format):
+        """在内存中编码图片，返回读取位置在开头的 BytesIO
+        
+        JPEG 在可用时交给 libjpeg-turbo 的SIMD编码器，参数与 PIL 的默认值一致
+        """
+        if img_format == 'JPEG' and image.mode in ('RGB', 'L'):
+            turbojpeg = FileManager.get_turbojpeg()
+            if turbojpeg is not None:
+                if image.mode == 'RGB':
+                    data = turbojpeg.encode(np.asarray(image), quality=FileManager.JPEG_QUALITY,
+                                            pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420)
+                else:
+                    data = turbojpeg.encode(np.asarray(image)[:, :, None], quality=FileManager.JPEG_QUALITY,
+                                            pixel_format=TJPF_GRAY, jpeg_subsample=TJSAMP_GRAY)
+                return io.BytesIO(data)
+        buf = io.BytesIO()
+        image.save(buf, img_format)
+        buf.seek(0)
+        return buf
     
     @staticmethod
     def export_images(images, base_path, format='png', dpi=300):
         """导出图片
         
         Args:
-            images: 图片列表
+            images: 图片列表或逐页产出图片的迭代器
             base_path: 基础路径
             format: 导出格式 (png, jpg, pdf)
             dpi: 分辨率 (仅用于PDF)
@@ -896,67 +1778,224 @@ class FileManager:
         Raises:
             Exception: 导出失败时抛出异常
         """
-        results = []
+        _, results, error = FileManager.export_image_iter(images, base_path, [format], dpi)[0]
+        if error:
+            raise Exception(f"导出图片失败: {error}")
+        return results
+    
+    @staticmethod
+    def export_image_iter(images, base_path, formats, dpi=300):
+        """逐页导出为多个格式，每产出一页就写出该页的图片文件，不必等全部页面渲染完成
+        
+        PDF 和 DOCX 需要全部页面，只保留每页的PNG编码结果，最后再生成文档，
+        内存中同时只有一页未压缩的图像。各格式共用每页的编码结果，单个格式失败不影响其他格式
+        
+        Args:
+            images: 图片列表或逐页产出图片的迭代器，如 handwrite 的返回值
+            base_path: 基础路径
+            formats: 导出格式列表 (png, jpg, jpeg, pdf, docx)
+            dpi: 分辨率 (仅用于PDF)
+            
+        Returns:
+            list: 每个格式的 (格式, 导出的文件路径列表, 错误信息)，成功时错误信息为 None
+        """
+        results = {fmt: [] for fmt in formats}
+        errors = {}
+        for fmt in formats:
+            if fmt.lower() not in ('png', 'jpg', 'jpeg', 'pdf', 'docx'):
+                errors[fmt] = f"不支持的导出格式: {fmt}"
+        
+        page_formats = [fmt for fmt in formats if fmt.lower() in ('png', 'jpg', 'jpeg') and fmt not in errors]
+        document_formats = [fmt for fmt in formats if fmt.lower() in ('pdf', 'docx') and fmt not in errors]
+        # 没有 img2pdf 时由PIL生成PDF，需要保留原始图像
+        keep_images = img2pdf is None and any(fmt.lower() == 'pdf' for fmt in document_formats)
+        keep_png = any(fmt.lower() == 'docx' for fmt in document_formats) or (
+            img2pdf is not None and any(fmt.lower() == 'pdf' for fmt in document_formats))
+        png_pages = []  # PDF 和 DOCX 使用的每页PNG编码
+        kept_images = []
+        
+        count = 0
         try:
-            if format == 'pdf':
-                # 如果是PDF格式，将所有图片合并为一个PDF文件
-                pdf_path = f"{base_path}.pdf"
-                
-                # 确保第一张图片存在
-                if images:
-                    # 保存为PDF
-                    images[0].save(
-                        pdf_path, 
-                        "PDF", 
-                        resolution=float(dpi), 
-                        save_all=True, 
-                        append_images=images[1:] if len(images) > 1 else []
-                    )
-                    results.append(pdf_path)
-                
-            elif format.lower() in ['png', 'jpg', 'jpeg']:
-                # 导出为单独的图片文件
-                ext = 'jpg' if format.lower() in ['jpg', 'jpeg'] else 'png'
-                img_format = 'JPEG' if ext == 'jpg' else 'PNG'
+            for i, image in enumerate(images):
+                count += 1
+                encoded = {}  # 本页各格式的编码结果
                 
-                for i, image in enumerate(images):
-                    page_path = f"{base_path}_第{i+1}页.{ext}"
-                    image.save(page_path, format=img_format)
-                    results.append(page_path)
-                    
-            elif format.lower() == 'docx':
-                # 将图片导出为Word文档
-                docx_path = f"{base_path}.docx"
-                doc = docx.Document()
+                for fmt in page_formats:
+                    if fmt in errors:
+                        continue
+                    ext = 'jpg' if fmt.lower() in ('jpg', 'jpeg') else 'png'
+                    img_format = 'JPEG' if ext == 'jpg' else 'PNG'
+                    try:
+                        if img_format not in encoded:
+                            encoded[img_format] = FileManager.encode_image(image, img_format).getvalue()
+                        # 先在内存中编码，再一次写入文件，避免编码器按块多次调用 write
+                        page_path = f"{base_path}_第{i+1}页.{ext}"
+                        FileManager.write_file(page_path, encoded[img_format])
+                        results[fmt].append(page_path)
+                    except Exception as e:
+                        errors[fmt] = str(e)
                 
-                for i, image in enumerate(images):
-                    # 保存为临时文件
-                    temp_path = f"{base_path}_temp_{i}.png"
-                    image.save(temp_path, 'PNG')
-                    
-                    # 添加到Word文档
-                    doc.add_picture(temp_path, width=docx.shared.Inches(6))
-                    
-                    # 如果不是最后一页，添加分页符
-                    if i < len(images) - 1:
-                        doc.add_page_break()
-                    
-                    # 删除临时文件
+                if keep_png:
+                    if image.mode in ('RGB', 'L'):
+                        if 'PNG' not in encoded:
+                            encoded['PNG'] = FileManager.encode_image(image, 'PNG').getvalue()
+                        png_pages.append(encoded['PNG'])
+                    else:
+                        # img2pdf 不支持透明通道
+                        png_pages.append(FileManager.encode_image(image.convert('RGB'), 'PNG').getvalue())
+                if keep_images:
+                    kept_images.append(image)
+        except Exception as e:
+            # 渲染失败或被取消，所有格式都无法完成，删除已写出的逐页文件，不留下不完整的结果
+            for paths in results.values():
+                for path in paths:
                     try:
-                        os.remove(temp_path)
-                    except:
+                        os.remove(path)
+                    except OSError:
                         pass
-                
-                # 保存Word文档
-                doc.save(docx_path)
-                results.append(docx_path)
-                
-            else:
-                raise ValueError(f"不支持的导出格式: {format}")
-                
-            return results
+            if isinstance(e, ExportCancelled):
+                raise
+            return [(fmt, [], errors.get(fmt, str(e))) for fmt in formats]
+        
+        if count == 0:
+            return [(fmt, [], errors.get(fmt, "未能生成图像")) for fmt in formats]
+        
+        for fmt in document_formats:
+            try:
+                if fmt.lower() == 'pdf':
+                    # 将所有页面合并为一个PDF文件
+                    pdf_path = f"{base_path}.pdf"
+                    if img2pdf is not None:
+                        # 每页的PNG由 img2pdf 无损嵌入，无需重新编码
+                        FileManager.write_file(pdf_path, img2pdf.convert(
+                            png_pages,
+                            layout_fun=img2pdf.get_fixed_dpi_layout_fun((dpi, dpi))
+                        ))
+                    else:
+                        kept_images[0].save(
+                            pdf_path,
+                            "PDF",
+                            resolution=float(dpi),
+                            save_all=True,
+                            append_images=kept_images[1:]
+                        )
+                    results[fmt].append(pdf_path)
+                else:
+                    # 将图片导出为Word文档
+                    docx_path = f"{base_path}.docx"
+                    doc = docx.Document()
+                    for i, data in enumerate(png_pages):
+                        # 添加到Word文档
+                        doc.add_picture(io.BytesIO(data), width=docx.shared.Inches(6))
+                        
+                        # 如果不是最后一页，添加分页符
+                        if i < len(png_pages) - 1:
+                            doc.add_page_break()
+                    
+                    # 保存Word文档
+                    buf = io.BytesIO()
+                    doc.save(buf)
+                    FileManager.write_file(docx_path, buf.getbuffer())
+                    results[fmt].append(docx_path)
+            except Exception as e:
+                errors[fmt] = str(e)
+        
+        return [(fmt, [] if fmt in errors else results[fmt], errors.get(fmt)) for fmt in formats]
+    
+    @staticmethod
+    def init_render_worker(cancel_event):
+        """导出进程池子进程的初始化函数，保存主进程传入的取消事件"""
+        FileManager._cancel_event = cancel_event
+    
+    @staticmethod
+    def render_and_export(section_text, settings, background_path, base_path, formats, dpi):
+        """渲染一段文本并逐页导出为各个格式，各格式共用同一次渲染结果，可在进程池中执行，参数均可序列化
+        
+        Args:
+            section_text: 要渲染的文本
+            settings: Settings 对象
+            background_path: 背景图路径，None 表示默认白色背景
+            base_path: 基础路径
+            formats: 导出格式列表
+            dpi: 分辨率 (仅用于PDF)
+            
+        Returns:
+            list: 每个格式的 (格式, 导出的文件路径列表, 错误信息)，成功时错误信息为 None
+        """
+        try:
+            template = settings.to_template(BackgroundCache.get(background_path))
         except Exception as e:
-            raise Exception(f"导出图片失败: {str(e)}")
+            return [(fmt, [], str(e)) for fmt in formats]
+        pages = handwrite(section_text, template)
+        if FileManager._cancel_event is not None:
+            # 主进程取消导出后，渲染完当前页即停止，本段抛出 ExportCancelled
+            pages = FileManager._until_cancelled(pages, FileManager._cancel_event)
+        return FileManager.export_image_iter(pages, base_path, formats, dpi)
+    
+    @staticmethod
+    def _until_cancelled(pages, cancel_event):
+        """逐页转发渲染结果，取消后不再渲染下一页，并抛出 ExportCancelled 使本段不生成任何文件"""
+        for page in pages:
+            yield page
+            if cancel_event.is_set():
+                raise ExportCancelled()
+    
+    # 拆分文本时依次尝试的分隔符，优先在段落、行、句子处断开
+    SPLIT_SEPARATORS = ["\n\n", "\n", "。", "！", "？", ".", " "]
+    
+    @staticmethod
+    def split_text(text, target):
+        """把长文本拆分为不超过 target 字的若干段，尽量在段落、行、句子处断开
+        
+        先按分隔符逐级拆分，再把相邻的小片段合并到接近 target，
+        过短的末段并入前一段，避免产生只有零星几个字的段落
+        
+        Args:
+            text: 要拆分的文本
+            target: 每段的目标字数
+            
+        Returns:
+            list: 拆分后的文本段，按顺序拼接即为原文
+        """
+        chunks = []
+        current = []
+        size = 0
+        for piece in FileManager._split_pieces(text, target, 0):
+            if current and size + len(piece) > target:
+                chunks.append(''.join(current))
+                current.clear()
+                size = 0
+            current.append(piece)
+            size += len(piece)
+        if current:
+            chunks.append(''.join(current))
+        
+        if len(chunks) > 1 and len(chunks[-1]) < target * 0.3:
+            tail = chunks.pop()
+            chunks[-1] += tail
+        return chunks
+    
+    @staticmethod
+    def _split_pieces(text, target, level):
+        """按第 level 级分隔符拆分，仍然过长的片段交给下一级分隔符，分隔符保留在片段末尾"""
+        if len(text) <= target:
+            return [text]
+        if level == len(FileManager.SPLIT_SEPARATORS):
+            return [text[i:i + target] for i in range(0, len(text), target)]
+        
+        sep = FileManager.SPLIT_SEPARATORS[level]
+        parts = text.split(sep)
+        pieces = [part + sep for part in parts[:-1]]
+        if parts[-1]:
+            pieces.append(parts[-1])
+        
+        result = []
+        for piece in pieces:
+            if len(piece) <= target:
+                result.append(piece)
+            else:
+                result.extend(FileManager._split_pieces(piece, target, level + 1))
+        return result
     
     @staticmethod
     def get_supported_import_formats():
@@ -969,10 +2008,35 @@ class FileManager:
         return "PDF文件 (*.pdf);;PNG图片 (*.png);;JPEG图片 (*.jpg);;Word文档 (*.docx)"
 
 class MainWindow(QMainWindow):
+    # 预览更新延迟(毫秒)，按参数对渲染的影响分档
+    PREVIEW_DELAY_CHEAP = 0
+    PREVIEW_DELAY_MEDIUM = 150
+    PREVIEW_DELAY_EXPENSIVE = 400
+    PREVIEW_DELAY_TEXT = 500
+    PREVIEW_SETTLE_DELAY = 800  # 停止调整数值框多久后视为拖动结束
+    PREVIEW_CHARS = 500  # 预览渲染的字数
+    FAST_PREVIEW_CHARS = 100  # 拖动期间快速预览的字数
+    FAST_PREVIEW_SCALE = 2  # 拖动期间快速预览的缩小倍数，显示时再放大
+    PROGRESS_UPDATE_INTERVAL = 1 / 30  # 批量导入导出时进度对话框的最短刷新间隔(秒)
+    PROGRESS_MIN_DURATION = 200  # 批量操作超过此时长(毫秒)才显示进度对话框
+    TEMPLATE_CACHE_SIZE = 8  # 缓存的模板数量上限
+    IMPORT_WORKERS = 4  # 批量导入时同时读取的文件数
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("手写模拟器 v1.0")
         self.settings_manager = SettingsManager()
+        self._settings_cache = None  # get_current_settings 的结果，控件变化时失效
+        self._background = None  # 当前选中的背景图，切换背景时失效
+        self._template_cache = {}  # (设置, 缩放) -> (背景图, 模板)
+        self._export_dialog = None  # 批量导出对话框，首次使用时创建
+        self._export_widgets = None  # 批量导出对话框中的控件
+        
+        # 窗口大小调整结束后只适配一次窗口，调整过程中的多次 resizeEvent 只会重新计时
+        self._resize_timer = QTimer()
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(100)
+        self._resize_timer.timeout.connect(lambda: self.preview.fit_to_window())
         self.setup_ui()
         self.setup_connections()
         self.load_settings()
@@ -980,12 +2044,34 @@ class MainWindow(QMainWindow):
         # 创建状态栏
         self.statusBar().showMessage("就绪")
         
-        # 创建工作线程对象
-        self.worker_thread = None
+        # 当前的导出渲染任务
+        self.render_job = None
+        
+        # 后台文件导入任务
+        self.import_task = None
+        self.import_signals = None
+        self._import_mode = None  # 单文件导入时尚未应用的导入方式，收到第一段文本时才处理已有文本
+        
+        # 导出用的常驻进程池，子进程在首次提交任务时才启动，之后各次导出复用。
+        # 笔画提取等 handright 的纯Python部分占了渲染的大部分时间，即使启用 numba 内核也要用多进程绕开GIL
+        # 取消事件在创建子进程时传入，批量导出取消后正在渲染的段落也能尽快停止
+        mp_context = multiprocessing.get_context("spawn")
+        self.export_cancel_event = mp_context.Event()
+        self.render_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=mp_context,
+            initializer=FileManager.init_render_worker,
+            initargs=(self.export_cancel_event,)
+        )
         
         # 主题管理器
         self.theme_manager = ThemeManager(QApplication.instance())
         
+        # 后台预加载字体目录中的字体
+        QThreadPool.globalInstance().start(
+            FontPreloadTask(FontCache.list_fonts(), self.distortion_inputs["字体大小"].value())
+        )
+        
     def setup_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -1189,10 +2275,9 @@ class MainWindow(QMainWindow):
         # 堆叠窗口
         self.stack = QStackedWidget()
         
-        # 文本编辑区
-        self.text_edit = QTextEdit()
-        self.text_edit.setAcceptRichText(False)  # 只接受纯文本
-        self.text_edit.setLineWrapMode(QTextEdit.WidgetWidth)
+        # 文本编辑区，纯文本编辑器对大量文本的排版远快于 QTextEdit
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setLineWrapMode(QPlainTextEdit.WidgetWidth)
         self.stack.addWidget(self.text_edit)
         
         # 预览区
@@ -1209,8 +2294,15 @@ class MainWindow(QMainWindow):
         
     def setup_connections(self):
         """设置信号连接"""
-        # 文本变化时更新预览
-        self.text_edit.textChanged.connect(self.delayed_preview_update)
+        # 文本变化时更新预览，只关心落在预览范围内的改动
+        self.text_edit.document().contentsChange.connect(self.on_text_contents_change)
+        
+        # 设置变化时使缓存的设置失效
+        for spinbox in list(self.margin_inputs.values()) + list(self.distortion_inputs.values()):
+            spinbox.valueChanged.connect(self._invalidate_settings)
+        self.font_combo.currentIndexChanged.connect(self._invalidate_settings)
+        self.bg_combo.currentIndexChanged.connect(self._invalidate_settings)
+        self.bg_combo.currentIndexChanged.connect(self._invalidate_background)
         
         # 设置变化时更新预览
         for spinbox in self.margin_inputs.values():
@@ -1234,6 +2326,24 @@ class MainWindow(QMainWindow):
         self.preview_timer = QTimer()
         self.preview_timer.setSingleShot(True)
         self.preview_timer.timeout.connect(self.update_preview)
+        
+        # 按参数对渲染结果的影响程度决定延迟：边距只是挪动位置，字体变化则要重新排版整页
+        self.preview_delays = {}
+        for name, spinbox in self.margin_inputs.items():
+            self.preview_delays[spinbox] = self.PREVIEW_DELAY_MEDIUM if name in ("字间距", "行间距") else self.PREVIEW_DELAY_CHEAP
+        for name, spinbox in self.distortion_inputs.items():
+            self.preview_delays[spinbox] = self.PREVIEW_DELAY_EXPENSIVE if name == "字体大小" else self.PREVIEW_DELAY_MEDIUM
+        self.preview_delays[self.font_combo] = self.PREVIEW_DELAY_EXPENSIVE
+        self.preview_delays[self.bg_combo] = self.PREVIEW_DELAY_EXPENSIVE
+        
+        # 拖动数值框期间只渲染少量文字作快速预览，松手（结束编辑或停止调整一段时间）后再完整渲染
+        self._dragging = False
+        self.settle_timer = QTimer()
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(self.PREVIEW_SETTLE_DELAY)
+        self.settle_timer.timeout.connect(self.finish_dragging)
+        for spinbox in list(self.margin_inputs.values()) + list(self.distortion_inputs.values()):
+            spinbox.editingFinished.connect(self.finish_dragging)
     
     def adjust_line_spacing(self, font_size):
         """当字体大小变化时，确保行间距足够大"""
@@ -1246,7 +2356,7 @@ class MainWindow(QMainWindow):
                 self.statusBar().showMessage(f"已自动调整行间距为 {min_line_spacing} (必须大于字体大小)")
     
     def delayed_preview_update(self):
-        """延迟更新预览，避免频繁更新"""
+        """延迟更新预览，延迟时间取决于触发更新的控件"""
         # 如果不在预览模式，不更新
         if not self.radio_preview.isChecked():
             return
@@ -1254,14 +2364,36 @@ class MainWindow(QMainWindow):
         # 设置状态栏提示
         self.statusBar().showMessage("预览内容已更改，等待更新...")
         
-        # 启动延迟定时器，延迟500ms
-        self.preview_timer.start(500)
+        sender = self.sender()
+        # 用户正在调整数值框（程序加载预设时控件没有焦点，不算拖动）
+        if isinstance(sender, QAbstractSpinBox) and sender.hasFocus():
+            self._dragging = True
+            self.settle_timer.start()
+        
+        # 启动延迟定时器，文本编辑等未登记的来源使用默认延迟
+        self.preview_timer.start(self.preview_delays.get(sender, self.PREVIEW_DELAY_TEXT))
+    
+    def on_text_contents_change(self, position, removed, added):
+        """文本改动位于预览渲染的字数之后时，预览内容不变，无需重新渲染"""
+        if position >= self.PREVIEW_CHARS:
+            return
+        self.delayed_preview_update()
+    
+    def finish_dragging(self):
+        """结束拖动，立即完整渲染一次预览"""
+        if not self._dragging:
+            return
+        self._dragging = False
+        self.settle_timer.stop()
+        self.preview_timer.stop()
+        self.update_preview()
     
     def force_preview_update(self):
         """强制更新预览"""
         # 切换到预览模式
         self.radio_preview.setChecked(True)
-        # 立即更新预览
+        # 立即更新预览，即使输入没有变化
+        self.preview.invalidate()
         self.update_preview()
     
     def update_preview(self):
@@ -1274,18 +2406,26 @@ class MainWindow(QMainWindow):
             # 确保视图已切换到预览
             self.stack.setCurrentIndex(1)
                 
-            text = self.text_edit.toPlainText()
+            # 获取当前设置
+            settings = self.get_current_settings()
+            
+            # 拖动期间只以较低的分辨率渲染开头少量文字
+            scale = self.FAST_PREVIEW_SCALE if self._dragging else 1
+            limit = self.FAST_PREVIEW_CHARS if self._dragging else self.PREVIEW_CHARS
+            text = self.preview_text(limit)
             if not text:
                 text = "预览文本示例"
             
-            # 获取当前设置
-            settings = self.get_current_settings()
+            # 渲染输入与正在显示或正在渲染的预览相同时（如切换视图、定时器重复触发），不再重新渲染
+            key = (text, scale, self.bg_combo.currentData(), settings)
+            if self.preview.is_current(key):
+                return
             
             # 创建模板
-            template = self.create_template(settings)
+            template = self.create_template(settings, scale)
             
             # 生成预览图像
-            self.preview.update_preview(text[:min(500, len(text))], template)
+            self.preview.update_preview(text, template, scale, key)
             
             # 更新状态栏
             self.statusBar().showMessage("预览已更新")
@@ -1294,6 +2434,14 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage(f"预览错误: {str(e)}")
             QMessageBox.warning(self, "预览错误", str(e))
     
+    def preview_text(self, limit):
+        """只取出文档开头的 limit 个字符，不必把整篇文档转换成字符串"""
+        document = self.text_edit.document()
+        cursor = QTextCursor(document)
+        cursor.setPosition(min(limit, document.characterCount() - 1), QTextCursor.KeepAnchor)
+        # 选中文本中的段落分隔符为 U+2029
+        return cursor.selectedText().replace('\u2029', '\n')
+    
     def import_text(self):
         """导入文件"""
         file_name, _ = QFileDialog.getOpenFileName(
@@ -1303,42 +2451,91 @@ class MainWindow(QMainWindow):
             FileManager.get_supported_import_formats()
         )
         
-        if file_name:
-            try:
-                # 显示状态栏信息
-                self.statusBar().showMessage(f"正在导入文件: {Path(file_name).name}...")
-                
-                # 导入文件
-                text = FileManager.import_file(Path(file_name))
-                
-                # 如果已经有文本，询问是否替换或追加
-                if self.text_edit.toPlainText():
-                    reply = QMessageBox.question(
-                        self,
-                        "导入方式",
-                        "已有文本，您希望如何处理？",
-                        QMessageBox.Cancel | QMessageBox.Discard | QMessageBox.Save,
-                        QMessageBox.Save
-                    )
-                    
-                    if reply == QMessageBox.Save:  # 追加
-                        self.text_edit.append("\n\n" + text)
-                    elif reply == QMessageBox.Discard:  # 替换
-                        self.text_edit.setPlainText(text)
-                    # Cancel 则不做任何操作
-                else:
-                    self.text_edit.setPlainText(text)
-                
-                self.statusBar().showMessage(f"成功导入文件: {Path(file_name).name}")
-                
-            except Exception as e:
-                self.statusBar().showMessage("导入失败")
-                QMessageBox.critical(self, "导入错误", str(e))
+        if not file_name:
+            return
+        
+        # 如果已经有文本，询问是否替换或追加，等收到导入的文本后才修改文本框，导入失败时保持原样
+        import_mode = None
+        if not self.text_edit.document().isEmpty():
+            reply = QMessageBox.question(
+                self,
+                "导入方式",
+                "已有文本，您希望如何处理？",
+                QMessageBox.Cancel | QMessageBox.Discard | QMessageBox.Save,
+                QMessageBox.Save
+            )
+            
+            if reply == QMessageBox.Save:  # 追加
+                import_mode = "append"
+            elif reply == QMessageBox.Discard:  # 替换
+                import_mode = "replace"
+            else:  # Cancel 则不做任何操作
+                return
+        
+        # 显示状态栏信息
+        self.statusBar().showMessage(f"正在导入文件: {Path(file_name).name}...")
+        
+        # 上一次尚未完成的导入不再写入文本框
+        if self.import_task is not None:
+            self.import_task.cancel()
+            self.import_signals.chunkReady.disconnect()
+            self.import_signals.finished.disconnect()
+            self.import_signals.errorOccurred.disconnect()
+        
+        # 在后台线程中提取文本，提取出的内容分段追加到文本框末尾
+        self._import_mode = import_mode
+        self.import_signals = ImportSignals()
+        self.import_signals.chunkReady.connect(self.append_imported_text)
+        self.import_signals.finished.connect(lambda: self.on_import_finished(Path(file_name).name))
+        self.import_signals.errorOccurred.connect(self.on_import_error)
+        self.import_task = ImportTask(Path(file_name), self.import_signals)
+        self.import_task.setAutoDelete(False)
+        QThreadPool.globalInstance().start(self.import_task)
+    
+    def apply_import_mode(self, mode):
+        """按导入方式处理已有文本：追加时添加分隔，替换时删除原有文本（可撤销）"""
+        if mode == "append":
+            self.text_edit.appendPlainText("\n\n")
+        elif mode == "replace":
+            # 用光标删除而不是 clear()，保留撤销历史
+            cursor = QTextCursor(self.text_edit.document())
+            cursor.select(QTextCursor.Document)
+            cursor.removeSelectedText()
+    
+    def append_imported_text(self, text):
+        """把导入的一段文本追加到文本框末尾，第一段到达时才处理已有文本"""
+        if self._import_mode is not None:
+            self.apply_import_mode(self._import_mode)
+            self._import_mode = None
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+    
+    def insert_text(self, text):
+        """把文本分段追加到文本框末尾，每段之间处理界面事件，大量文本时界面不会卡住"""
+        cursor = QTextCursor(self.text_edit.document())
+        cursor.movePosition(QTextCursor.End)
+        for start in range(0, len(text), ImportTask.CHUNK_SIZE):
+            cursor.insertText(text[start:start + ImportTask.CHUNK_SIZE])
+            QApplication.processEvents()
+    
+    def on_import_finished(self, name):
+        """导入完成，文件没有内容时替换方式仍然清空原有文本"""
+        if self._import_mode is not None:
+            self.apply_import_mode(self._import_mode)
+            self._import_mode = None
+        self.statusBar().showMessage(f"成功导入文件: {name}")
+    
+    def on_import_error(self, error_msg):
+        """导入出错，尚未收到文本时文本框保持不变"""
+        self._import_mode = None
+        self.statusBar().showMessage("导入失败")
+        QMessageBox.critical(self, "导入错误", error_msg)
     
     def export_image(self):
         """导出手写图片"""
-        text = self.text_edit.toPlainText()
-        if not text:
+        # 只检查是否为空，文本在确定导出之后才取出
+        if self.text_edit.document().isEmpty():
             QMessageBox.warning(self, "警告", "请先输入要转换的文本")
             return
         
@@ -1354,6 +2551,7 @@ class MainWindow(QMainWindow):
                 
             file_name = file_dialog.selectedFiles()[0]
             selected_filter = file_dialog.selectedNameFilter()
+            text = self.text_edit.toPlainText()
             
             # 获取选择的格式
             if "PDF" in selected_filter:
@@ -1371,14 +2569,14 @@ class MainWindow(QMainWindow):
             settings = self.get_current_settings()
             
             # 检查字体大小和行间距
-            font_size = settings['font_size']
-            line_spacing = settings['margins']['行间距']
+            font_size = settings.font_size
+            line_spacing = settings.line_spacing
             
             if line_spacing <= font_size:
                 # 自动调整行间距
                 old_line_spacing = line_spacing
                 line_spacing = int(font_size * 1.5)
-                settings['margins']['行间距'] = line_spacing
+                settings = replace(settings, line_spacing=line_spacing)
                 
                 # 更新UI中的行间距值
                 if '行间距' in self.margin_inputs:
@@ -1403,12 +2601,12 @@ class MainWindow(QMainWindow):
             # 创建模板
             template = self.create_template(settings)
             
-            # 创建工作线程
-            self.worker_thread = WorkerThread(text, template)
+            # 创建渲染任务的信号载体
+            signals = RenderSignals(self)
             
             # 连接信号
-            self.worker_thread.progressChanged.connect(self.progress_bar.setValue)
-            self.worker_thread.progressChanged.connect(progress_dialog.setValue)
+            signals.progressChanged.connect(self.progress_bar.setValue)
+            signals.progressChanged.connect(progress_dialog.setValue)
             
             # 定义结果处理函数
             def handle_result(images):
@@ -1446,68 +2644,53 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "导出错误", error_msg)
             
             # 连接结果和错误信号
-            self.worker_thread.resultReady.connect(handle_result)
-            self.worker_thread.errorOccurred.connect(handle_error)
+            signals.resultReady.connect(handle_result)
+            signals.errorOccurred.connect(handle_error)
+            
+            # 创建渲染任务，每次导出的任务各自持有信号载体，连续点击导出也不会互相覆盖
+            self.render_job = RenderJob(text, template, signals, executor=self.render_pool)
             
             # 连接取消按钮
-            progress_dialog.canceled.connect(self.worker_thread.cancel)
+            progress_dialog.canceled.connect(self.render_job.cancel)
             
-            # 启动线程
-            self.worker_thread.start()
+            # 提交到线程池，复用池中的线程
+            QThreadPool.globalInstance().start(self.render_job)
             
         except Exception as e:
             self.progress_bar.setVisible(False)
             QMessageBox.critical(self, "导出错误", str(e))
     
-    def create_template(self, settings=None):
-        """根据设置创建模板"""
+    def create_template(self, settings=None, scale=1):
+        """根据设置创建模板，scale 大于1时按比例缩小画布、字号、间距和扰动，用于快速预览"""
         if settings is None:
             settings = self.get_current_settings()
         
-        # 获取背景
-        background = self.get_current_background()
-        
-        # 获取字体
-        font_name = settings['font']
-        font_path = Path("fonts") / f"{font_name}.ttf"
-        if not font_path.exists():
-            # 尝试查找完整文件名
-            for font_file in Path("fonts").glob("*.ttf"):
-                if font_file.stem == font_name:
-                    font_path = font_file
-                    break
-            else:
-                font_path = "simsun.ttc"  # 使用系统默认字体
-        
         try:
             # 确保行间距始终大于字体大小，防止Handright报错
-            font_size = settings['font_size']
-            line_spacing = settings['margins']['行间距']
+            font_size = settings.font_size
+            line_spacing = settings.line_spacing
             
             # 行间距必须大于字体大小，至少为字体大小的1.5倍
             if line_spacing <= font_size:
                 line_spacing = int(font_size * 1.5)
+                settings = replace(settings, line_spacing=line_spacing)
                 # 更新UI中的行间距值
                 if '行间距' in self.margin_inputs:
                     self.margin_inputs['行间距'].setValue(line_spacing)
                     self.statusBar().showMessage(f"已自动调整行间距为 {line_spacing} (必须大于字体大小)")
             
-            return Template(
-                background=background,
-                font=ImageFont.truetype(str(font_path), size=font_size),
-                line_spacing=line_spacing,
-                word_spacing=settings['margins']['字间距'],
-                left_margin=settings['margins']['左边距'],
-                top_margin=settings['margins']['上边距'],
-                right_margin=settings['margins']['右边距'],
-                bottom_margin=settings['margins']['下边距'],
-                word_spacing_sigma=settings['distortions']['字间距扰动'],
-                line_spacing_sigma=settings['distortions']['行间距扰动'],
-                font_size_sigma=settings['distortions']['字体大小扰动'],
-                perturb_x_sigma=settings['distortions']['横向偏移扰动'],
-                perturb_y_sigma=settings['distortions']['纵向偏移扰动'],
-                perturb_theta_sigma=settings['distortions']['旋转角度扰动']
-            )
+            # 设置和背景都没有变化时复用上次创建的模板
+            background = self.get_current_background()
+            key = (settings, scale)
+            cached = self._template_cache.get(key)
+            if cached is not None and cached[0] is background:
+                return cached[1]
+            
+            template = settings.to_template(background, scale)
+            if len(self._template_cache) >= self.TEMPLATE_CACHE_SIZE:
+                self._template_cache.clear()  # 模板持有背景图，不无限累积
+            self._template_cache[key] = (background, template)
+            return template
         except Exception as e:
             raise Exception(f"创建模板失败: {str(e)}")
         
@@ -1516,40 +2699,68 @@ class MainWindow(QMainWindow):
         settings = self.settings_manager.load_settings()
         if settings:
             try:
-                # 恢复各项设置
-                if 'font' in settings:
-                    index = self.font_combo.findText(settings['font'])
-                    if index >= 0:
-                        self.font_combo.setCurrentIndex(index)
+                # 恢复各项设置，期间屏蔽控件信号，全部设置完后只更新一次预览
+                self.preview_timer.stop()
+                with self.batched_signals(self.settings_controls()):
+                    if 'font' in settings:
+                        index = self.font_combo.findText(settings['font'])
+                        if index >= 0:
+                            self.font_combo.setCurrentIndex(index)
                 
-                if 'margins' in settings:
-                    for name, value in settings['margins'].items():
-                        if name in self.margin_inputs:
-                            self.margin_inputs[name].setValue(value)
+                    if 'margins' in settings:
+                        for name, value in settings['margins'].items():
+                            if name in self.margin_inputs:
+                                self.margin_inputs[name].setValue(value)
                 
-                if 'distortions' in settings:
-                    for name, value in settings['distortions'].items():
-                        mapped_name = {
-                            "字间距扰动": "字间距扰动",
-                            "行间距扰动": "行间距扰动",
-                            "字体大小扰动": "字体大小随机扰动",
-                            "横向偏移扰动": "笔画横向偏移随机扰动",
-                            "纵向偏移扰动": "笔画纵向偏移随机扰动",
-                            "旋转角度扰动": "笔画旋转偏移随机扰动"
-                        }.get(name, name)
+                    if 'distortions' in settings:
+                        for name, value in settings['distortions'].items():
+                            mapped_name = {
+                                "字间距扰动": "字间距扰动",
+                                "行间距扰动": "行间距扰动",
+                                "字体大小扰动": "字体大小随机扰动",
+                                "横向偏移扰动": "笔画横向偏移随机扰动",
+                                "纵向偏移扰动": "笔画纵向偏移随机扰动",
+                                "旋转角度扰动": "笔画旋转偏移随机扰动"
+                            }.get(name, name)
                         
-                        if mapped_name in self.distortion_inputs:
-                            self.distortion_inputs[mapped_name].setValue(value)
+                            if mapped_name in self.distortion_inputs:
+                                self.distortion_inputs[mapped_name].setValue(value)
                             
+                self.settings_loaded()
+                
                 self.statusBar().showMessage("已加载上次的设置")
             except Exception as e:
                 self.statusBar().showMessage(f"加载设置失败: {str(e)}")
     
+    def settings_controls(self):
+        """所有会影响渲染结果的设置控件"""
+        return [self.font_combo, self.bg_combo,
+                *self.margin_inputs.values(), *self.distortion_inputs.values()]
+    
+    @contextmanager
+    def batched_signals(self, widgets):
+        """在代码块执行期间屏蔽控件信号，避免逐个设置控件值时反复触发预览更新"""
+        for widget in widgets:
+            widget.blockSignals(True)
+        try:
+            yield
+        finally:
+            for widget in widgets:
+                widget.blockSignals(False)
+    
+    def settings_loaded(self):
+        """批量设置控件值之后，补上被屏蔽的缓存失效和行间距检查，并更新一次预览"""
+        self._invalidate_settings()
+        self._invalidate_background()
+        self.adjust_line_spacing(self.distortion_inputs["字体大小"].value())
+        if self.radio_preview.isChecked():
+            self.preview_timer.start(0)
+    
     def save_settings(self):
         """保存当前设置"""
         try:
             settings = self.get_current_settings()
-            self.settings_manager.save_settings(settings)
+            self.settings_manager.save_settings(settings.to_dict())
             self.statusBar().showMessage("设置已保存")
         except Exception as e:
             self.statusBar().showMessage(f"保存设置失败: {str(e)}")
@@ -1557,64 +2768,73 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """窗口关闭时保存设置"""
         self.save_settings()
+        self.settings_manager.flush()
         
-        # 如果有正在运行的线程，停止它
-        if self.worker_thread and self.worker_thread.isRunning():
-            self.worker_thread.cancel()
-            self.worker_thread.wait(1000)  # 等待最多1秒让线程结束
+        # 取消正在进行的渲染任务，等待线程池中的任务结束
+        if self.render_job is not None:
+            self.render_job.cancel()
+        if self.preview.worker is not None:
+            self.preview.worker.cancel()
+        QThreadPool.globalInstance().waitForDone(1000)  # 等待最多1秒让任务结束
+        
+        self.render_pool.shutdown(wait=False, cancel_futures=True)
             
         super().closeEvent(event)
 
     def update_font_list(self):
         """更新字体列表"""
         self.font_combo.clear()
-        fonts_dir = Path("fonts")
-        if fonts_dir.exists():
-            for font in fonts_dir.glob("*.ttf"):
-                self.font_combo.addItem(font.stem)
+        for font in FontCache.list_fonts():
+            self.font_combo.addItem(font.stem)
         if self.font_combo.count() == 0:
             self.font_combo.addItem("默认字体")
     
     def update_background_list(self):
         """更新背景列表"""
         self.bg_combo.clear()
-        backgrounds_dir = Path("backgrounds")
         self.bg_combo.addItem("默认白色背景", None)
         
-        if backgrounds_dir.exists():
-            for ext in ['.png', '.jpg', '.jpeg']:
-                for f in backgrounds_dir.glob(f"*{ext}"):
-                    self.bg_combo.addItem(f.stem, str(f))
+        for f in DirectoryCache.scan("backgrounds", ('.png', '.jpg', '.jpeg')):
+            self.bg_combo.addItem(f.stem, str(f))
+    
+    def _invalidate_background(self):
+        """切换背景后丢弃当前背景，下次读取时重新查找（文件有修改时会重新解码）"""
+        self._background = None
     
     def get_current_background(self):
-        """获取当前选中的背景"""
-        bg_path = self.bg_combo.currentData()
-        if bg_path and Path(bg_path).exists():
-            return Image.open(bg_path).convert('RGB')
-        return Image.new('RGB', (1000, 1000), color='white')
+        """获取当前选中的背景，背景选择不变时不再访问文件"""
+        if self._background is None:
+            self._background = BackgroundCache.get(self.bg_combo.currentData())
+        return self._background
+    
+    def _invalidate_settings(self):
+        """控件值变化后丢弃缓存的设置，下次读取时重新构建"""
+        self._settings_cache = None
     
     def get_current_settings(self):
-        """获取当前所有设置"""
-        return {
-            "font": self.font_combo.currentText(),
-            "font_size": self.distortion_inputs["字体大小"].value(),
-            "margins": {
-                "上边距": self.margin_inputs["上边距"].value(),
-                "下边距": self.margin_inputs["下边距"].value(),
-                "左边距": self.margin_inputs["左边距"].value(),
-                "右边距": self.margin_inputs["右边距"].value(),
-                "字间距": self.margin_inputs["字间距"].value(),
-                "行间距": self.margin_inputs["行间距"].value()
-            },
-            "distortions": {
-                "字间距扰动": self.distortion_inputs["字间距扰动"].value(),
-                "行间距扰动": self.distortion_inputs["行间距扰动"].value(),
-                "字体大小扰动": self.distortion_inputs["字体大小随机扰动"].value(),
-                "横向偏移扰动": self.distortion_inputs["笔画横向偏移随机扰动"].value(),
-                "纵向偏移扰动": self.distortion_inputs["笔画纵向偏移随机扰动"].value(),
-                "旋转角度扰动": self.distortion_inputs["笔画旋转偏移随机扰动"].value()
-            }
-        }
+        """获取当前所有设置，控件没有变化时直接返回缓存的结果"""
+        if self._settings_cache is None:
+            self._settings_cache = self._read_settings()
+        return self._settings_cache
+    
+    def _read_settings(self):
+        """从各个控件读取设置"""
+        return Settings(
+            font=self.font_combo.currentText(),
+            font_size=self.distortion_inputs["字体大小"].value(),
+            top_margin=self.margin_inputs["上边距"].value(),
+            bottom_margin=self.margin_inputs["下边距"].value(),
+            left_margin=self.margin_inputs["左边距"].value(),
+            right_margin=self.margin_inputs["右边距"].value(),
+            word_spacing=self.margin_inputs["字间距"].value(),
+            line_spacing=self.margin_inputs["行间距"].value(),
+            word_spacing_sigma=self.distortion_inputs["字间距扰动"].value(),
+            line_spacing_sigma=self.distortion_inputs["行间距扰动"].value(),
+            font_size_sigma=self.distortion_inputs["字体大小随机扰动"].value(),
+            perturb_x_sigma=self.distortion_inputs["笔画横向偏移随机扰动"].value(),
+            perturb_y_sigma=self.distortion_inputs["笔画纵向偏移随机扰动"].value(),
+            perturb_theta_sigma=self.distortion_inputs["笔画旋转偏移随机扰动"].value()
+        )
     
     def on_view_changed(self):
         """视图切换时更新预览"""
@@ -1629,7 +2849,7 @@ class MainWindow(QMainWindow):
         super().resizeEvent(event)
         if self.radio_preview.isChecked() and hasattr(self, 'preview'):
             # 在窗口调整大小后略微延迟更新，以确保UI已重新布局
-            QTimer.singleShot(100, lambda: self.preview.fit_to_window())
+            self._resize_timer.start()
 
     def clear_text(self):
         """清空文本内容"""
@@ -1667,7 +2887,7 @@ class MainWindow(QMainWindow):
         name, ok = QInputDialog.getText(self, "保存预设", "请输入预设名称:")
         if ok and name:
             settings = self.get_current_settings()
-            if self.settings_manager.save_preset(name, settings):
+            if self.settings_manager.save_preset(name, settings.to_dict()):
                 QMessageBox.information(self, "成功", f"预设 '{name}' 已保存。")
             else:
                 QMessageBox.warning(self, "错误", "保存预设失败。")
@@ -1682,40 +2902,43 @@ class MainWindow(QMainWindow):
         preset = presets[preset_name]
         
         try:
-            # 设置字体
-            if 'font' in preset:
-                index = self.font_combo.findText(preset['font'])
-                if index >= 0:
-                    self.font_combo.setCurrentIndex(index)
-            
-            # 设置字体大小
-            if 'font_size' in preset:
-                self.distortion_inputs["字体大小"].setValue(preset['font_size'])
-            
-            # 设置边距
-            if 'margins' in preset:
-                for name, value in preset['margins'].items():
-                    if name in self.margin_inputs:
-                        self.margin_inputs[name].setValue(value)
-            
-            # 设置扰动
-            if 'distortions' in preset:
-                for name, value in preset['distortions'].items():
-                    mapped_name = {
-                        "字间距扰动": "字间距扰动",
-                        "行间距扰动": "行间距扰动",
-                        "字体大小扰动": "字体大小随机扰动",
-                        "横向偏移扰动": "笔画横向偏移随机扰动",
-                        "纵向偏移扰动": "笔画纵向偏移随机扰动",
-                        "旋转角度扰动": "笔画旋转偏移随机扰动"
-                    }.get(name, name)
+            # 期间屏蔽控件信号，全部设置完后只更新一次预览
+            self.preview_timer.stop()
+            with self.batched_signals(self.settings_controls()):
+                # 设置字体
+                if 'font' in preset:
+                    index = self.font_combo.findText(preset['font'])
+                    if index >= 0:
+                        self.font_combo.setCurrentIndex(index)
+            
+                # 设置字体大小
+                if 'font_size' in preset:
+                    self.distortion_inputs["字体大小"].setValue(preset['font_size'])
+            
+                # 设置边距
+                if 'margins' in preset:
+                    for name, value in preset['margins'].items():
+                        if name in self.margin_inputs:
+                            self.margin_inputs[name].setValue(value)
+            
+                # 设置扰动
+                if 'distortions' in preset:
+                    for name, value in preset['distortions'].items():
+                        mapped_name = {
+                            "字间距扰动": "字间距扰动",
+                            "行间距扰动": "行间距扰动",
+                            "字体大小扰动": "字体大小随机扰动",
+                            "横向偏移扰动": "笔画横向偏移随机扰动",
+                            "纵向偏移扰动": "笔画纵向偏移随机扰动",
+                            "旋转角度扰动": "笔画旋转偏移随机扰动"
+                        }.get(name, name)
                     
-                    if mapped_name in self.distortion_inputs:
-                        self.distortion_inputs[mapped_name].setValue(value)
+                        if mapped_name in self.distortion_inputs:
+                            self.distortion_inputs[mapped_name].setValue(value)
+            
+            self.settings_loaded()
             
             self.statusBar().showMessage(f"已加载预设 '{preset_name}'")
-            # 更新预览
-            self.delayed_preview_update()
             
         except Exception as e:
             QMessageBox.warning(self, "错误", f"加载预设时出错: {str(e)}")
@@ -1805,38 +3028,60 @@ class MainWindow(QMainWindow):
         # 创建进度对话框
         progress = QProgressDialog("正在导入文件...", "取消", 0, len(file_names), self)
         progress.setWindowModality(Qt.WindowModal)
-        progress.show()
+        progress.setMinimumDuration(self.PROGRESS_MIN_DURATION)
         
-        combined_text = ""
-        imported_count = 0
+        texts = [None] * len(file_names)  # 按选择顺序保存各文件的文本
+        errors = {}  # 文件序号 -> 错误信息
         
-        for i, file_name in enumerate(file_names):
-            try:
-                text = FileManager.import_file(Path(file_name))
-                # 如果不是第一个文件，添加分隔符
-                if combined_text:
-                    combined_text += "\n\n" + "=" * 30 + "\n\n"
-                combined_text += text
-                imported_count += 1
+        # 多个文件并行读取和解析，磁盘读取的等待相互重叠，结果仍按选择顺序拼接
+        executor = ThreadPoolExecutor(max_workers=min(self.IMPORT_WORKERS, len(file_names)))
+        futures = {executor.submit(FileManager.import_file, Path(file_name)): i
+                   for i, file_name in enumerate(file_names)}
+        pending = set(futures)
+        last_update = 0.0
+        
+        try:
+            while pending:
+                # 定时醒来刷新进度并检查取消
+                done, pending = wait(pending, timeout=self.PROGRESS_UPDATE_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = futures[future]
+                    try:
+                        texts[i] = future.result()
+                    except Exception as e:
+                        # 先记录错误，全部导入结束后一起显示
+                        errors[i] = f"导入文件 '{Path(file_names[i]).name}' 时出错: {str(e)}"
                 
-                # 更新进度
-                progress.setValue(i + 1)
+                # 更新进度，限制刷新频率，每次刷新都会重绘并处理事件
+                now = time.monotonic()
+                if now - last_update >= self.PROGRESS_UPDATE_INTERVAL:
+                    progress.setValue(len(file_names) - len(pending))
+                    last_update = now
                 
-                # 检查是否取消
+                # 检查是否取消，已完成的文件照常导入
                 if progress.wasCanceled():
                     break
-                    
-            except Exception as e:
-                QMessageBox.warning(
-                    self,
-                    "导入错误",
-                    f"导入文件 '{Path(file_name).name}' 时出错: {str(e)}"
-                )
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        # 空文件和未完成的文件不占位，分隔符只出现在有内容的文件之间
+        parts = [text for text in texts if text]
+        imported_count = sum(text is not None for text in texts)
+        import_errors = [errors[i] for i in sorted(errors)]
+        
+        progress.setValue(len(file_names))
+        
+        if import_errors:
+            self.show_import_errors(import_errors, imported_count)
+        
+        # 各文件之间添加分隔符，最后一次性拼接
+        separator = "\n\n" + "=" * 30 + "\n\n"
+        combined_text = separator.join(parts)
         
         # 更新文本框
         if imported_count > 0:
             # 如果已经有文本，询问是否替换或追加
-            if self.text_edit.toPlainText():
+            if not self.text_edit.document().isEmpty():
                 reply = QMessageBox.question(
                     self,
                     "导入方式",
@@ -1846,23 +3091,38 @@ class MainWindow(QMainWindow):
                 )
                 
                 if reply == QMessageBox.Save:  # 追加
-                    self.text_edit.append("\n\n" + combined_text)
+                    self.apply_import_mode("append")
+                    self.insert_text(combined_text)
                 elif reply == QMessageBox.Discard:  # 替换
-                    self.text_edit.setPlainText(combined_text)
+                    self.apply_import_mode("replace")
+                    self.insert_text(combined_text)
                 # Cancel 则不做任何操作
             else:
-                self.text_edit.setPlainText(combined_text)
+                self.insert_text(combined_text)
                 
             self.statusBar().showMessage(f"已导入 {imported_count} 个文件")
     
-    def batch_export(self):
-        """批量导出多种格式"""
-        text = self.text_edit.toPlainText()
-        if not text:
-            QMessageBox.warning(self, "警告", "请先输入要转换的文本")
-            return
+    def show_import_errors(self, errors, imported_count):
+        """在一个对话框中列出批量导入时的全部错误"""
+        error_dialog = QDialog(self)
+        error_dialog.setWindowTitle("导入错误")
+        error_dialog.resize(600, 400)
+        
+        error_layout = QVBoxLayout(error_dialog)
+        error_layout.addWidget(QLabel(f"成功导入 {imported_count} 个文件，{len(errors)} 个文件导入失败"))
+        
+        error_list = QListWidget()
+        error_list.addItems(errors)
+        error_layout.addWidget(error_list)
         
-        # 创建多格式导出对话框
+        close_btn = QPushButton("关闭")
+        close_btn.clicked.connect(error_dialog.accept)
+        error_layout.addWidget(close_btn, alignment=Qt.AlignRight)
+        
+        error_dialog.exec()
+    
+    def _build_export_dialog(self):
+        """创建批量导出对话框，控件保存在 self._export_widgets 中"""
         export_dialog = QDialog(self)
         export_dialog.setWindowTitle("批量导出")
         export_dialog.resize(400, 300)
@@ -1873,17 +3133,14 @@ class MainWindow(QMainWindow):
         formats_group = QGroupBox("选择导出格式")
         formats_layout = QVBoxLayout(formats_group)
         
-        pdf_check = QCheckBox("PDF")
-        png_check = QCheckBox("PNG")
-        jpg_check = QCheckBox("JPEG")
-        docx_check = QCheckBox("DOCX")
-        
-        pdf_check.setChecked(True)
-        
-        formats_layout.addWidget(pdf_check)
-        formats_layout.addWidget(png_check)
-        formats_layout.addWidget(jpg_check)
-        formats_layout.addWidget(docx_check)
+        format_checks = {
+            "pdf": QCheckBox("PDF"),
+            "png": QCheckBox("PNG"),
+            "jpeg": QCheckBox("JPEG"),
+            "docx": QCheckBox("DOCX")
+        }
+        for check in format_checks.values():
+            formats_layout.addWidget(check)
         
         layout.addWidget(formats_group)
         
@@ -1893,16 +3150,13 @@ class MainWindow(QMainWindow):
         
         dpi_spin = QSpinBox()
         dpi_spin.setRange(72, 600)
-        dpi_spin.setValue(300)
         dpi_spin.setSingleStep(10)
         
         split_check = QCheckBox("拆分长文本")
         split_spin = QSpinBox()
         split_spin.setRange(100, 10000)
-        split_spin.setValue(1000)
         split_spin.setSingleStep(100)
         split_spin.setSuffix(" 字/段")
-        split_spin.setEnabled(False)
         
         split_check.toggled.connect(split_spin.setEnabled)
         
@@ -1925,20 +3179,60 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(buttons)
         
+        self._export_widgets = {
+            "formats": format_checks,
+            "dpi": dpi_spin,
+            "split": split_check,
+            "split_size": split_spin
+        }
+        return export_dialog
+    
+    def _load_export_options(self):
+        """从 QSettings 恢复批量导出选项，取消对话框时的修改不会保留"""
+        settings = QSettings()
+        widgets = self._export_widgets
+        for fmt, check in widgets["formats"].items():
+            check.setChecked(settings.value(f"batch_export/{fmt}", fmt == "pdf", type=bool))
+        widgets["dpi"].setValue(settings.value("batch_export/dpi", 300, type=int))
+        split = settings.value("batch_export/split", False, type=bool)
+        widgets["split"].setChecked(split)
+        widgets["split_size"].setValue(settings.value("batch_export/split_size", 1000, type=int))
+        widgets["split_size"].setEnabled(split)
+    
+    def _save_export_options(self):
+        """保存本次使用的批量导出选项"""
+        settings = QSettings()
+        widgets = self._export_widgets
+        for fmt, check in widgets["formats"].items():
+            settings.setValue(f"batch_export/{fmt}", check.isChecked())
+        settings.setValue("batch_export/dpi", widgets["dpi"].value())
+        settings.setValue("batch_export/split", widgets["split"].isChecked())
+        settings.setValue("batch_export/split_size", widgets["split_size"].value())
+    
+    def batch_export(self):
+        """批量导出多种格式"""
+        # 只检查是否为空，文本在确定导出之后才取出
+        if self.text_edit.document().isEmpty():
+            QMessageBox.warning(self, "警告", "请先输入要转换的文本")
+            return
+        
+        # 多格式导出对话框只创建一次，每次显示前恢复上次使用的选项
+        if self._export_dialog is None:
+            self._export_dialog = self._build_export_dialog()
+        self._load_export_options()
+        
         # 显示对话框
-        if export_dialog.exec() != QDialog.Accepted:
+        if self._export_dialog.exec() != QDialog.Accepted:
             return
+        self._save_export_options()
+        
+        widgets = self._export_widgets
+        dpi_spin = widgets["dpi"]
+        split_check = widgets["split"]
+        split_spin = widgets["split_size"]
         
         # 检查选择的格式
-        formats = []
-        if pdf_check.isChecked():
-            formats.append("pdf")
-        if png_check.isChecked():
-            formats.append("png")
-        if jpg_check.isChecked():
-            formats.append("jpeg")
-        if docx_check.isChecked():
-            formats.append("docx")
+        formats = [fmt for fmt, check in widgets["formats"].items() if check.isChecked()]
         
         if not formats:
             QMessageBox.warning(self, "警告", "请至少选择一种导出格式")
@@ -1954,6 +3248,9 @@ class MainWindow(QMainWindow):
         
         if not export_dir:
             return
+        
+        # 取出一次文本，之后的拆分和渲染任务都使用这份文本
+        text = self.text_edit.toPlainText()
             
         # 准备导出
         try:
@@ -1961,14 +3258,14 @@ class MainWindow(QMainWindow):
             settings = self.get_current_settings()
             
             # 检查字体大小和行间距
-            font_size = settings['font_size']
-            line_spacing = settings['margins']['行间距']
+            font_size = settings.font_size
+            line_spacing = settings.line_spacing
             
             if line_spacing <= font_size:
                 # 自动调整行间距
                 old_line_spacing = line_spacing
                 line_spacing = int(font_size * 1.5)
-                settings['margins']['行间距'] = line_spacing
+                settings = replace(settings, line_spacing=line_spacing)
                 
                 # 更新UI中的行间距值
                 if '行间距' in self.margin_inputs:
@@ -1981,20 +3278,24 @@ class MainWindow(QMainWindow):
                     f"行间距值({old_line_spacing})小于字体大小({font_size})，已自动调整为{line_spacing}。"
                 )
             
-            # 创建模板
-            template = self.create_template(settings)
+            # 创建模板，渲染在工作池中进行，这里只检查设置能否生成模板
+            self.create_template(settings)
+            background_path = self.bg_combo.currentData()
             
-            # 创建进度对话框
-            total_tasks = len(formats)
+            # 处理文本拆分，尽量在段落、句子处断开
             if split_check.isChecked():
-                # 如果需要拆分，计算段数
-                chars_per_section = split_spin.value()
-                sections = (len(text) + chars_per_section - 1) // chars_per_section
-                total_tasks *= sections
+                text_sections = FileManager.split_text(text, split_spin.value())
+            else:
+                text_sections = [text]
+            
+            # 创建进度对话框
+            total_tasks = len(formats) * len(text_sections)
             
             progress = QProgressDialog("正在生成导出文件...", "取消", 0, total_tasks, self)
             progress.setWindowModality(Qt.WindowModal)
-            progress.show()
+            progress.setMinimumDuration(self.PROGRESS_MIN_DURATION)
+            progress.setValue(0)
+            last_update = 0.0
             
             # 显示进度条
             self.progress_bar.setVisible(True)
@@ -2003,60 +3304,68 @@ class MainWindow(QMainWindow):
             all_files = []
             current_task = 0
             
-            # 处理文本拆分
-            if split_check.isChecked():
-                chars_per_section = split_spin.value()
-                text_sections = []
-                
-                # 拆分文本
-                for i in range(0, len(text), chars_per_section):
-                    text_sections.append(text[i:i+chars_per_section])
-            else:
-                text_sections = [text]
-            
             # 创建错误日志
             errors = []
             
-            # 导出每种格式
+            # 每个段落作为一个任务提交到工作池并行渲染，同一段落只渲染一次，再导出为各个格式
+            # 本次导出的所有文件使用同一个时间戳前缀
+            prefix = f"手写_{time.strftime('%Y%m%d_%H%M%S')}"
+            tasks = {}
+            # 正在渲染的段落在取消后渲染完当前页即停止，尚未开始的段落直接取消
+            self.export_cancel_event.clear()
             for section_idx, section_text in enumerate(text_sections):
-                for fmt in formats:
-                    # 更新进度
-                    progress.setValue(current_task)
-                    progress.setLabelText(f"正在导出 {fmt.upper()} 格式 (段落 {section_idx + 1}/{len(text_sections)})...")
-                    
-                    # 检查是否取消
-                    if progress.wasCanceled():
-                        break
-                        
+                # 创建导出文件名
+                filename = prefix
+                if len(text_sections) > 1:
+                    filename += f"_段落{section_idx + 1}"
+                
+                base_path = os.path.join(export_dir, filename)
+                future = self.render_pool.submit(
+                    FileManager.render_and_export,
+                    section_text, settings, background_path, base_path, formats, dpi_spin.value()
+                )
+                tasks[future] = section_idx
+            
+            # 按完成顺序收集结果，等待期间处理界面事件以响应取消。
+            # 取消后仍等待正在渲染的段落结束（它们渲染完当前页就会停止并删除已写出的文件），
+            # 下一次导出清除取消事件时不会有旧任务继续渲染
+            pending = set(tasks)
+            cancelled = False
+            while pending:
+                done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    section_idx = tasks[future]
+                    if future.cancelled():
+                        continue
                     try:
-                        # 生成手写图片
-                        images = list(handwrite(section_text, template))
-                        
-                        if not images:
-                            errors.append(f"段落 {section_idx + 1} 的 {fmt.upper()} 格式导出失败: 未能生成图像")
-                            continue
-                        
-                        # 创建导出文件名
-                        filename = f"手写_{time.strftime('%Y%m%d_%H%M%S')}"
-                        if len(text_sections) > 1:
-                            filename += f"_段落{section_idx + 1}"
-                        
-                        # 导出文件
-                        base_path = os.path.join(export_dir, filename)
-                        exported = FileManager.export_images(
-                            images, 
-                            base_path, 
-                            format=fmt,
-                            dpi=dpi_spin.value()
-                        )
+                        results = future.result()
+                    except ExportCancelled:
+                        continue
+                    except Exception as e:
+                        results = [(fmt, [], str(e)) for fmt in formats]
+                    for fmt, exported, error in results:
                         all_files.extend(exported)
+                        if error:
+                            errors.append(f"段落 {section_idx + 1} 的 {fmt.upper()} 格式导出失败: {error}")
                     
-                    except Exception as e:
-                        errors.append(f"段落 {section_idx + 1} 的 {fmt.upper()} 格式导出失败: {str(e)}")
-                        
-                    finally:
-                        current_task += 1
-                        progress.setValue(current_task)
+                    current_task += len(formats)
+                
+                # 更新进度，限制刷新频率
+                now = time.monotonic()
+                if not cancelled and done and now - last_update >= self.PROGRESS_UPDATE_INTERVAL:
+                    progress.setValue(current_task)
+                    progress.setLabelText(f"已完成 {current_task // len(formats)}/{len(text_sections)} 个段落...")
+                    last_update = now
+                
+                QApplication.processEvents()
+                
+                # 检查是否取消，尚未开始的段落直接取消，正在渲染的段落继续等待其结束
+                if not cancelled and progress.wasCanceled():
+                    cancelled = True
+                    self.export_cancel_event.set()
+                    for future in pending:
+                        future.cancel()
+                    self.statusBar().showMessage("正在取消导出...")
             
             # 隐藏进度条
             self.progress_bar.setVisible(False)
@@ -2073,6 +3382,9 @@ class MainWindow(QMainWindow):
             
             # 导出结果信息
             header_text = f"共导出 {len(all_files)} 个文件"
+            if cancelled:
+                header_text = f"导出已取消，已完成的段落共导出 {len(all_files)} 个文件"
+                self.statusBar().showMessage("导出已取消")
             if errors:
                 header_text += f"，但有 {len(errors)} 个错误"
             
@@ -2110,7 +3422,7 @@ class MainWindow(QMainWindow):
             
             # 打开目录按钮
             open_dir_btn = QPushButton("打开导出目录")
-            open_dir_btn.clicked.connect(lambda: os.startfile(export_dir))
+            open_dir_btn.clicked.connect(lambda: FileManager.open_folder(export_dir))
             
             close_btn = QPushButton("关闭")
             close_btn.clicked.connect(result_dialog.accept)
@@ -2141,37 +3453,38 @@ def main():
         
         # 检查必要的目录是否存在
         for dir_name in ["fonts", "backgrounds"]:
-            dir_path = Path(dir_name)
-            if not dir_path.exists():
-                dir_path.mkdir(exist_ok=True)
+            try:
+                Path(dir_name).mkdir(parents=True)
                 print(f"已创建目录: {dir_name}")
+            except FileExistsError:
+                pass
         
         # 检查字体目录是否有字体文件
-        if not list(Path("fonts").glob("*.ttf")):
+        if not FontCache.list_fonts():
             print("提示: 字体目录中没有找到TTF字体文件，将使用系统默认字体")
             
             # 尝试使用默认的示例字体
             if Path("Handright-master.zip").exists():
                 try:
-                    import zipfile
                     with zipfile.ZipFile("Handright-master.zip", 'r') as zip_ref:
                         for file in zip_ref.namelist():
                             if file.endswith('.ttf') and not file.startswith('__MACOSX'):
                                 # 提取到fonts目录
                                 zip_ref.extract(file, "temp")
                                 # 移动文件
-                                import shutil
                                 source_file = Path("temp") / file
                                 target_file = Path("fonts") / Path(file).name
                                 shutil.move(str(source_file), str(target_file))
                                 print(f"已从示例包中提取字体: {target_file}")
                     # 清理临时目录
-                    import shutil
                     if Path("temp").exists():
                         shutil.rmtree("temp")
                 except Exception as e:
                     print(f"提取示例字体失败: {e}")
         
+        # 后台预编译渲染内核，避免首次预览时等待JIT编译
+        threading.Thread(target=HandrightAccelerator.warm_up, daemon=True).start()
+        
         # 创建主窗口并显示
         window = MainWindow()
         window.resize(900, 500)
@@ -2186,6 +3499,7 @@ def main():
         # 提示版本信息
         print(f"手写模拟器 v1.0 已启动")
         print(f"Python版本: {sys.version}")
+        print(f"Pillow版本: {PIL.__version__}" + (" (SIMD)" if ".post" in PIL.__version__ else ""))
    
         
         # 执行应用程序